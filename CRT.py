@@ -1,4 +1,11 @@
 from typing import List, Tuple
+from math import gcd
+from euclid import extended_gcd_arrays, mod_inverse
+
+try:
+    import numpy as np
+except ImportError:  # reconstruct_many uses Python ints on every level
+    np = None
 
 """
 Chinese Remainder Theorem (weak form and generalized form)
@@ -27,27 +34,17 @@ Generalized form:
   New modulus = lcm(m1, m2) = m1//g * m2.
 
 This implementation:
+- mod_inverse comes from euclid.py (shared with the linear congruence and
+  Diophantine scripts)
 - chinese_remainder_pair merges two congruences (possibly non-coprime moduli)
 - chinese_remainder takes arrays A (remainders) and M (moduli)
 - Returns (x, L) where x is the smallest non-negative solution modulo L
 - Returns (-1, -1) if invalid or no solution
+- CRTPlan(moduli) precomputes a product tree for many reconstructions with the same moduli
+- chinese_remainder_arrays merges many same-shape systems column by column with numpy
 """
 
 
-def extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
-    """Return (g,x,y) such that g = gcd(a,b) and ax + by = g."""
-    if b == 0:
-        return (a, 1, 0)
-    g, x1, y1 = extended_gcd(b, a % b)
-    return (g, y1, x1 - (a // b) * y1)
-
-def mod_inverse(a: int, mod: int) -> int:
-    """Return inverse of a modulo mod; assumes gcd(a,mod)=1."""
-    g, x, _ = extended_gcd(a, mod)
-    if g != 1:
-        raise ValueError("Inverse does not exist")
-    return x % mod
-
 def chinese_remainder_pair(a1: int, m1: int, a2: int, m2: int) -> Tuple[int, int]:
     """
     Merge:
@@ -57,13 +54,14 @@ def chinese_remainder_pair(a1: int, m1: int, a2: int, m2: int) -> Tuple[int, int
     """
     if m1 <= 0 or m2 <= 0:
         return (-1, -1)
-    g, p, q = extended_gcd(m1, m2)
+    g = gcd(m1, m2)
     diff = a2 - a1
     if diff % g != 0:
         return (-1, -1)  # Inconsistent
     # Solve m1 * t ≡ diff (mod m2)
     m2_reduced = m2 // g
-    t = (diff // g) * (p % m2_reduced) % m2_reduced
+    p = mod_inverse(m1 // g % m2_reduced, m2_reduced)
+    t = (diff // g) * p % m2_reduced
     x = a1 + m1 * t
     mod = m1 // g * m2
     x %= mod
@@ -107,3 +105,187 @@ def chinese_remainder_coprime(A: List[int], M: List[int]) -> Tuple[int, int]:
         prod *= m
     return (x % prod, prod)
 
+
+# Repeated reconstruction with fixed moduli (multi-modular arithmetic): CRTPlan(moduli).
+#
+# The pairwise coprime moduli are the leaves of a product tree. Each internal node with children
+# (xL mod mL) and (xR mod mR) stores c = mL^-1 mod mR once, and a reconstruction walks up the tree:
+#     x = xL + mL * ((xR - xL) * c mod mR)        (mod mL * mR)
+# Every level costs a few products of numbers as large as the node moduli, so a vector of k
+# residues is rebuilt in O(M(n) log k) for an n-bit product instead of O(n^2) for the
+# left-to-right fold, and no inverse is recomputed per call. Building the plan costs about as
+# much as one fold (the inverses near the root are big), so one-off systems keep the fold.
+#
+# reconstruct_many runs the lower levels as numpy int64 columns across the whole batch (while the
+# node moduli stay below 2^31 / 2^62) and the upper levels with Python ints.
+# symmetric=True returns the representative in (-M/2, M/2], for signed results such as
+# determinants or polynomial coefficients computed modulo several primes.
+
+_NUMPY_FACTOR_MAX = 1 << 31  # (xR - xL) * c stays below 2^62
+_NUMPY_NODE_MAX = 1 << 62
+
+class CRTPlan:
+    __slots__ = ("moduli", "modulus", "levels")
+
+    def __init__(self, moduli: List[int]):
+        moduli = list(moduli)
+        if not moduli or any(m <= 0 for m in moduli):
+            raise ValueError("moduli must be a non-empty list of positive integers")
+        self.moduli = moduli
+        # levels[i] = (left moduli, right moduli, inverses, odd) merging level i into level i + 1
+        self.levels = []
+        nodes = moduli
+        while len(nodes) > 1:
+            left, right = nodes[0:len(nodes) - 1:2], nodes[1::2]
+            try:
+                inverses = [mod_inverse(ml % mr, mr) for ml, mr in zip(left, right)]
+            except ValueError:
+                raise ValueError("moduli are not pairwise coprime") from None
+            self.levels.append((left, right, inverses, len(nodes) % 2 == 1))
+            nodes = [ml * mr for ml, mr in zip(left, right)] + (nodes[-1:] if len(nodes) % 2 else [])
+        self.modulus = nodes[0]
+
+    def __repr__(self):
+        return "CRTPlan(%d moduli, modulus bits=%d)" % (len(self.moduli), self.modulus.bit_length())
+
+    def _finish(self, x: int, symmetric: bool) -> int:
+        if symmetric and 2 * x > self.modulus:
+            x -= self.modulus
+        return x
+
+    def reconstruct(self, residues: List[int], symmetric: bool = False) -> int:
+        """The x mod prod(moduli) with x = residues[i] (mod moduli[i]) for every i."""
+        if len(residues) != len(self.moduli):
+            raise ValueError("expected %d residues" % len(self.moduli))
+        xs = [int(a) % m for a, m in zip(residues, self.moduli)]  # numpy ints would overflow
+        for left, right, inverses, odd in self.levels:
+            merged = [xl + ml * ((xr - xl) * c % mr)
+                      for xl, xr, ml, mr, c in zip(xs[0::2], xs[1::2], left, right, inverses)]
+            if odd:
+                merged.append(xs[-1])
+            xs = merged
+        return self._finish(xs[0], symmetric)
+
+    def reconstruct_many(self, rows, symmetric: bool = False) -> List[int]:
+        """[reconstruct(row) for row in rows]; the batch shares every level of the tree."""
+        rows = [list(row) for row in rows]
+        k = len(self.moduli)
+        if any(len(row) != k for row in rows):
+            raise ValueError("expected %d residues per row" % k)
+        if not rows:
+            return []
+        levels = iter(self.levels)
+        level = next(levels, None)
+        cols = None
+        if np is not None and max(self.moduli) < _NUMPY_NODE_MAX:
+            try:
+                cols = np.array(rows, dtype=np.int64).T  # one column array per node, across the batch
+            except OverflowError:
+                cols = np.array([[int(a) % m for a, m in zip(row, self.moduli)] for row in rows],
+                                dtype=np.int64).T
+            cols %= np.array(self.moduli, dtype=np.int64)[:, None]
+            while level is not None:
+                left, right, inverses, odd = level
+                if (max(right) >= _NUMPY_FACTOR_MAX
+                        or max(ml * mr for ml, mr in zip(left, right)) >= _NUMPY_NODE_MAX):
+                    break
+                ml = np.array(left, dtype=np.int64)[:, None]
+                mr = np.array(right, dtype=np.int64)[:, None]
+                c = np.array(inverses, dtype=np.int64)[:, None]
+                xl, xr = cols[0:len(cols) - 1:2], cols[1::2]
+                merged = xl + ml * ((xr - xl) % mr * c % mr)
+                cols = np.concatenate((merged, cols[-1:])) if odd else merged
+                level = next(levels, None)
+            xs = [col.tolist() for col in cols]
+        else:
+            xs = [[int(row[i]) % m for row in rows] for i, m in enumerate(self.moduli)]
+        while level is not None:
+            left, right, inverses, odd = level
+            merged = [[a + ml * ((b - a) * c % mr) for a, b in zip(col_l, col_r)]
+                      for col_l, col_r, ml, mr, c in zip(xs[0::2], xs[1::2], left, right, inverses)]
+            if odd:
+                merged.append(xs[-1])
+            xs = merged
+            level = next(levels, None)
+        return [self._finish(x, symmetric) for x in xs[0]]
+
+
+# Many small systems of the same shape: chinese_remainder_arrays(A, M) with A[i], M[i] arrays
+# (row r is the system x ≡ A[i][r] (mod M[i][r]) for every i). The pair merge above runs on
+# whole columns: np.gcd, a vectorized extended Euclid for the inverses (euclid.py) and masks
+# instead of early returns. Rows whose lcm would reach 2^62 are taken out of the int64 arrays and
+# solved with chinese_remainder on Python ints; only then are the results object arrays.
+
+_INT64_LIMIT = 1 << 62
+
+def _mulmod(a, b, m):
+    """a * b mod m elementwise for int64 arrays with 0 <= a, b < m < 2^62."""
+    if not m.size or m.max() < _NUMPY_FACTOR_MAX:
+        return a * b % m
+    r = np.zeros_like(a)
+    for bit in range(int(b.max()).bit_length() - 1, -1, -1):
+        r = 2 * r % m
+        r = np.where((b >> bit) & 1 == 1, (r + a) % m, r)  # r, a < m < 2^62: no overflow
+    return r
+
+def chinese_remainder_arrays(A, M):
+    """
+    Column-wise generalized CRT.
+    Return (x, L, ok): per row the smallest non-negative solution x modulo L = lcm, and a
+    boolean mask that is False for rows with no solution or a non-positive modulus (x = L = 0
+    there). x and L are int64 arrays, or object arrays if some row's lcm reaches 2^62.
+    """
+    if np is None:
+        raise ImportError("chinese_remainder_arrays needs numpy; use chinese_remainder per row")
+    if len(A) != len(M) or not len(A):
+        raise ValueError("need the same positive number of residue and modulus columns")
+    try:
+        A = [np.asarray(a, dtype=np.int64) for a in A]
+        M = [np.asarray(m, dtype=np.int64) for m in M]
+    except OverflowError:  # values past int64: every row goes through Python ints
+        A = [np.asarray(a, dtype=object) for a in A]
+        M = [np.asarray(m, dtype=object) for m in M]
+    rows = len(A[0])
+    ok = np.ones(rows, dtype=bool)
+    big = np.zeros(rows, dtype=bool)  # rows left to chinese_remainder
+    if A[0].dtype == object:
+        big[:] = True
+        for m in M:
+            ok &= m > 0  # chinese_remainder would divide by a zero modulus
+        x = np.zeros(rows, dtype=np.int64)
+        L = np.zeros(rows, dtype=np.int64)
+    else:
+        ok &= M[0] > 0
+        L = np.where(ok, M[0], 1)
+        x = A[0] % L
+        for a, m in zip(A[1:], M[1:]):
+            ok &= m > 0
+            live = np.flatnonzero(ok & ~big)
+            m1, m2 = L[live], m[live]
+            x1, x2 = x[live], a[live] % m2
+            g = np.gcd(m1, m2)
+            diff = x2 - x1
+            consistent = diff % g == 0
+            m1g = m1 // g
+            fits = m1g <= (_INT64_LIMIT - 1) // m2
+            big[live[consistent & ~fits]] = True
+            ok[live[~consistent]] = False
+            sel = consistent & fits
+            live, m1, m2, x1, g, diff, m1g = (v[sel] for v in (live, m1, m2, x1, g, diff, m1g))
+            m2r = m2 // g
+            _, inv, _ = extended_gcd_arrays(m1g % m2r, m2r)
+            t = _mulmod(diff // g % m2r, inv % m2r, m2r)
+            x[live] = x1 + m1 * t
+            L[live] = m1g * m2
+    x[~ok] = 0
+    L[~ok] = 0
+    if big.any():
+        x = x.astype(object)
+        L = L.astype(object)
+        for r in np.flatnonzero(big & ok).tolist():
+            res_x, res_m = chinese_remainder([int(a[r]) for a in A], [int(m[r]) for m in M])
+            if res_x == -1:
+                ok[r] = False
+                res_x, res_m = 0, 0
+            x[r], L[r] = res_x, res_m
+    return x, L, ok
@@ -1,4 +1,10 @@
 from math import gcd
+from totient import phi, phi_range, power_tower, power_tower_many, totient_chain
+# phi(n) is factorization-backed and LRU-cached (totient.py), so the repeated phi(m) calls
+# below cost one factorization per distinct modulus.
+# Towers a^b^c^... mod m: power_tower applies the rule below once per level of the cached
+# chain totient_chain(m) = (m, phi(m), phi(phi(m)), ..., 1); power_tower_many batches towers
+# that share m.
 # Extended exponent reduction (non-coprime case):
 
 # For general x, m, and n >= log2(m):
@@ -56,37 +62,10 @@ def pow_mod_coprime(a: int, e: int, m: int) -> int:
     return pow(a % m, e, m)
 
 
-def phi(n: int) -> int:
-    """
-    Compute Euler's Totient (phi) of n.
-    phi(n) = count of integers k in [1, n] such that gcd(k, n) = 1.
-    Requires n >= 1.
-    """
-    result = n
-    x = n
-    p = 2
-    while p * p <= x:
-        if x % p == 0:
-            while x % p == 0:
-                x //= p
-            result -= result // p
-        p += 1 if p == 2 else 2  # check 2 then only odds
-    if x > 1:
-        result -= result // x
-    return result
-
-
 def phi_sieve(limit: int) -> list:
     """
-    Compute phi(k) for all 1 <= k <= limit using a sieve in O(limit log log limit).
+    Compute phi(k) for all 0 <= k <= limit with totient.phi_range (segmented numpy passes, or
+    the linear sieve without numpy).
     Returns list phi where phi[k] = phi(k).
     """
-    phi = list(range(limit + 1))
-    for i in range(2, limit + 1):
-        if phi[i] == i:  # i is prime
-            step = i
-            for j in range(i, limit + 1, step):
-                phi[j] -= phi[j] // i
-    return phi
-
-print(phi(1337))
\ No newline at end of file
+    return list(phi_range(limit))
@@ -43,53 +43,28 @@ Fibonacci numbers (F_n) possess numerous notable identities and number-theoretic
 """
 
 from math import sqrt
+from fibonacci import fib, fib_many, fib_pair, pisano_period
 
 _phi = (1 + sqrt(5)) / 2
 _psi = (1 - sqrt(5)) / 2
 _sqrt5 = sqrt(5)
+_BINET_MAX = 70  # doubles stop rounding to the right integer past about F_71
 
 def fib_binet(n: int) -> int:
-    """Return F_n using Binet's formula (accurate for n >= 0 within integer rounding)."""
+    """Return F_n using Binet's formula for n <= 70; exact (fibonacci.fib) above, where floats lose digits."""
+    if n > _BINET_MAX:
+        return fib(n)
     return int(round((_phi**n - _psi**n) / _sqrt5))
 
 def fib_fast_doubling(n: int) -> int:
-    """Return F_n using fast doubling (O(log n)), exact for large n."""
-    if n < 0:
-        raise ValueError("n must be non-negative")
-    def _fd(k):
-        if k == 0:
-            return (0, 1)
-        a, b = _fd(k // 2)
-        c = a * (2 * b - a)
-        d = a * a + b * b
-        if k % 2 == 0:
-            return (c, d)
-        else:
-            return (d, c + d)
-    return _fd(n)[0]
+    """Return F_n using fast doubling (O(log n)), exact for large n (iterative, see fibonacci.py)."""
+    return fib(n)
 
 def fib_matrix(n: int) -> int:
-    """Return F_n using 2x2 matrix exponentiation (O(log n))."""
-    # Identity matrix and Fibonacci Q-matrix
-    res = (1, 0, 0, 1)      # (a b; c d)
-    base = (1, 1, 1, 0)
-    k = n
-    while k:
-        if k & 1:
-            # res = res * base
-            r00 = res[0] * base[0] + res[1] * base[2]
-            r01 = res[0] * base[1] + res[1] * base[3]
-            r10 = res[2] * base[0] + res[3] * base[2]
-            r11 = res[2] * base[1] + res[3] * base[3]
-            res = (r00, r01, r10, r11)
-        # base = base * base
-        b00 = base[0] * base[0] + base[1] * base[2]
-        b01 = base[0] * base[1] + base[1] * base[3]
-        b10 = base[2] * base[0] + base[3] * base[2]
-        b11 = base[2] * base[1] + base[3] * base[3]
-        base = (b00, b01, b10, b11)
-        k >>= 1
-    return res[1]
+    """Return F_n (O(log n)); the 2x2 matrix power is fast doubling with the redundant entries dropped."""
+    return fib(n)
 
 
-#best is to calculate using phi feild (CSES Fibo)
\ No newline at end of file
+# F_n mod m for huge n: fib(n, m) reduces n modulo pisano_period(m) (property 7) first;
+# many queries: fib_many(ns, m).
+#best is to calculate using phi feild (CSES Fibo)
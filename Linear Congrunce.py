@@ -1,5 +1,8 @@
-from typing import List, Tuple
+from typing import List
 from math import gcd
+from operator import index
+from euclid import mod_inverse as _mod_inverse
+from CRT import chinese_remainder_pair
 
 # Linear Congruence Solver: Solve a * x ≡ b (mod m)
 # Theory:
@@ -13,44 +16,132 @@ from math import gcd
 # (they are distinct modulo m and there are exactly g of them)
 #
 # We implement:
-# - extended_gcd: returns (g, x, y) with ax + by = g
-# - mod_inverse: inverse of a modulo m (assuming gcd(a,m)=1)
-# - solve_linear_congruence: returns sorted list of all solutions or empty list
+# - mod_inverse: inverse of a modulo m, or -1 if gcd(a, m) != 1
+# - solve_linear_congruence: returns all solutions as a Progression (empty if none)
+# - solve_linear_congruence_system: all x with a_i x ≡ b_i (mod m_i) for every i
 #
-# Complexity: O(log min(a, m))
-
+# The g solutions are never materialized: Progression(x0, step, count) stands for
+#    x0, x0 + step, ..., x0 + (count - 1) step
+# (here x0 < m' = step, count = g), with iteration in increasing order, indexing, slicing
+# with a positive stride (again a Progression) and O(1) membership. .count is the exact size;
+# len() only works while it fits in sys.maxsize. Two progressions intersect by CRT on
+# x ≡ x0 (mod step) and x ≡ y0 (mod step2) followed by clipping to the overlap of their
+# ranges, so a system of congruences (with any, not necessarily prime or coprime moduli) is
+# solved by intersecting the per-congruence progressions, without enumerating any of them.
+#
+# Complexity: O(log min(a, m)) per congruence
 
-def extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
-    if b == 0:
-        return a, 1, 0
-    g, x1, y1 = extended_gcd(b, a % b)
-    x = y1
-    y = x1 - (a // b) * y1
-    return g, x, y
 
 def mod_inverse(a: int, m: int) -> int:
-    a %= m
-    g, x, _ = extended_gcd(a, m)
-    if g != 1:
+    try:
+        return _mod_inverse(a, m)
+    except ValueError:
         return -1
-    return x % m
 
-def solve_linear_congruence(a: int, b: int, m: int) -> List[int]:
+class Progression:
+    """x0 + k * step for 0 <= k < count (step >= 1), as a lazy read-only sequence."""
+    __slots__ = ("x0", "step", "count")
+
+    def __init__(self, x0: int, step: int, count: int):
+        if step < 1:
+            raise ValueError("step must be positive")
+        self.x0 = x0
+        self.step = step
+        self.count = max(count, 0)
+
+    def __repr__(self):
+        return "Progression(x0=%d, step=%d, count=%d)" % (self.x0, self.step, self.count)
+
+    def __len__(self):
+        return self.count  # OverflowError past sys.maxsize: use .count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        return iter(range(self.x0, self.x0 + self.count * self.step, self.step))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, stride = i.indices(self.count)
+            if stride < 0:
+                raise ValueError("a progression slice needs a positive stride")
+            return Progression(self.x0 + start * self.step, self.step * stride,
+                               (stop - start + stride - 1) // stride)
+        i = index(i)
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("progression index out of range")
+        return self.x0 + i * self.step
+
+    def __contains__(self, x: int) -> bool:
+        k, r = divmod(x - self.x0, self.step)
+        return r == 0 and 0 <= k < self.count
+
+    def __eq__(self, other):
+        if isinstance(other, Progression):
+            if self.count != other.count:
+                return False
+            if self.count == 0:
+                return True
+            return self.x0 == other.x0 and (self.count == 1 or self.step == other.step)
+        if isinstance(other, (list, tuple, range)):
+            return len(other) == self.count and all(u == v for u, v in zip(self, other))
+        return NotImplemented
+
+    def last(self) -> int:
+        return self.x0 + (self.count - 1) * self.step
+
+    def intersect(self, other: "Progression") -> "Progression":
+        """The common elements, again a progression (step lcm of the steps)."""
+        if not self.count or not other.count:
+            return Progression(0, 1, 0)
+        z, lcm = chinese_remainder_pair(self.x0 % self.step, self.step,
+                                        other.x0 % other.step, other.step)
+        if z == -1:
+            return Progression(0, 1, 0)
+        lo = max(self.x0, other.x0)
+        hi = min(self.last(), other.last())
+        first = lo + (z - lo) % lcm
+        if first > hi:
+            return Progression(0, 1, 0)
+        return Progression(first, lcm, (hi - first) // lcm + 1)
+
+    __and__ = intersect
+
+def solve_linear_congruence(a: int, b: int, m: int) -> Progression:
+    """All x in [0, m) with a x ≡ b (mod m), in increasing order."""
     a %= m
     b %= m
     g = gcd(a, m)
     if b % g != 0:
-        return []
-    if g == 1:
-        inv = mod_inverse(a, m)
-        return [ (inv * b) % m ]
+        return Progression(0, 1, 0)
     # Reduce
     a_ = a // g
     b_ = b // g
     m_ = m // g
     inv = mod_inverse(a_, m_)
     x0 = (inv * b_) % m_
-    # Generate all g solutions modulo m
-    sols = [ (x0 + k * m_) % m for k in range(g) ]
-    sols.sort()
-    return sols
+    # The g solutions modulo m: x0 + k m_ for k = 0 .. g-1
+    return Progression(x0, m_, g)
+
+def solve_linear_congruence_system(A: List[int], B: List[int], M: List[int]) -> Progression:
+    """
+    All x in [0, lcm(M)) with A[i] x ≡ B[i] (mod M[i]) for every i, in increasing order
+    (empty progression if the system has no solution).
+    """
+    if not (len(A) == len(B) == len(M)) or not M or any(m <= 0 for m in M):
+        raise ValueError("need equally many a, b and positive moduli")
+    x, step = 0, 1
+    for a, b, m in zip(A, B, M):
+        sols = solve_linear_congruence(a, b, m)
+        if not sols:
+            return Progression(0, 1, 0)
+        x, step = chinese_remainder_pair(x, step, sols.x0, sols.step)
+        if x == -1:
+            return Progression(0, 1, 0)
+    period = 1
+    for m in M:
+        period = period // gcd(period, m) * m
+    return Progression(x, step, period // step)
@@ -1,11 +1,7 @@
-import sys
+from functools import lru_cache
 from math import gcd
-
-def extended_gcd(a, b):
-    if b == 0:
-        return a, 1, 0
-    g, x1, y1 = extended_gcd(b, a % b)
-    return g, y1, x1 - (a // b) * y1
+from euclid import extended_gcd, mod_inverse  # iterative: no recursion limit on huge coefficients
+from floor_sum import count_lattice_polygon
 
 def find_any_solution(a, b, c):
     if a == 0 and b == 0:
@@ -21,58 +17,159 @@ def find_any_solution(a, b, c):
     if b < 0: y = -y
     return True, x, y, g
 
-def shift_solution(x, y, a, b, k):
-    return x + k * b, y - k * a
-
 def count_solutions(a, b, c, x1, x2, y1, y2):
-    ok, x0, y0, g = find_any_solution(a, b, c)
-    if not ok: 
+    if a == 0 and b == 0:
+        # every (x, y) in the box if c == 0, none otherwise
+        return max(0, x2 - x1 + 1) * max(0, y2 - y1 + 1) if c == 0 else 0
+    return solver(a, b).count(c, x1, x2, y1, y2)
+
+
+# Non-rectangular regions. The solutions of a x + b y = c lie on one line,
+#     (x, y) = (x0, y0) + k (dx, dy),
+# so every half-plane p x + q y <= r becomes k (p dx + q dy) <= r - p x0 - q y0, a bound on k,
+# and any convex polygon given by half-planes is one interval of k: O(#constraints).
+# Counting all (x, y) >= 0 with a x + b y <= c (solutions summed over every right-hand side
+# up to c) is a lattice-point count under a line: floor_sum.count_under_line, O(log).
+
+def solution_line(a, b, c):
+    """(x0, y0, dx, dy): the solutions are (x0 + k dx, y0 + k dy) for all integers k; None if none."""
+    if a == 0 and b == 0:
+        raise ValueError("a = b = 0: the solutions are not a line")
+    return solver(a, b).line(c)
+
+def count_solutions_in_region(a, b, c, constraints):
+    """
+    Number of integer solutions of a x + b y = c with p x + q y <= r for every (p, q, r) in
+    constraints (any convex polygon, e.g. a triangle x >= 0, y >= 0, x + 2 y <= 100).
+    Raises ValueError if the region leaves infinitely many solutions.
+    """
+    if a == 0 and b == 0:
+        raise ValueError("a = b = 0: the solutions are not a line")
+    return solver(a, b).count_in_region(c, constraints)
+
+
+# Batches where (a, b) repeat: solver(a, b) is cached, and keeps g = gcd(a, b) and the Bezout
+# pair a X + b Y = g, so for a new c the line is (X c/g, Y c/g) + k (b/g, -a/g) with no gcd
+# work, and a box is one interval of k: count is O(1) arithmetic, solutions() walks the interval.
+
+_SOLVER_CACHE_SIZE = 1 << 10
+
+class DiophantineSolver:
+    """Solutions of a x + b y = c for a fixed (a, b) != (0, 0) and any c."""
+    __slots__ = ("a", "b", "g", "x", "y")
+
+    def __init__(self, a, b):
+        if a == 0 and b == 0:
+            raise ValueError("a = b = 0: the solutions are not a line")
+        self.a, self.b = a, b
+        self.g, self.x, self.y = extended_gcd(a, b)
+
+    def __repr__(self):
+        return "DiophantineSolver(a=%d, b=%d)" % (self.a, self.b)
+
+    def line(self, c):
+        """(x0, y0, dx, dy) as in solution_line; None if g does not divide c."""
+        if c % self.g:
+            return None
+        e = c // self.g
+        return self.x * e, self.y * e, self.b // self.g, -(self.a // self.g)
+
+    def _interval(self, c, x1, x2, y1, y2):
+        """(x0, y0, dx, dy, k_low, k_high) for the solutions in the box; None if there are none."""
+        line = self.line(c)
+        if line is None:
+            return None
+        x0, y0, dx, dy = line
+        k_low, k_high = None, None
+        for base, step, low, high in ((x0, dx, x1, x2), (y0, dy, y1, y2)):
+            if step == 0:
+                if not low <= base <= high:
+                    return None
+                continue
+            if step < 0:
+                base, step, low, high = -base, -step, -high, -low
+            lo = -((base - low) // step)  # ceil((low - base) / step)
+            hi = (high - base) // step
+            k_low = lo if k_low is None else max(k_low, lo)
+            k_high = hi if k_high is None else min(k_high, hi)
+        if k_low > k_high:
+            return None
+        return x0, y0, dx, dy, k_low, k_high
+
+    def count(self, c, x1, x2, y1, y2):
+        """Number of solutions with x1 <= x <= x2, y1 <= y <= y2."""
+        box = self._interval(c, x1, x2, y1, y2)
+        return 0 if box is None else box[5] - box[4] + 1
+
+    def solutions(self, c, x1, x2, y1, y2):
+        """The solutions in the box, lazily, by increasing x (by increasing y if b = 0)."""
+        box = self._interval(c, x1, x2, y1, y2)
+        if box is None:
+            return
+        x0, y0, dx, dy, k_low, k_high = box
+        if dx > 0 or (dx == 0 and dy > 0):
+            ks = range(k_low, k_high + 1)
+        else:
+            ks = range(k_high, k_low - 1, -1)
+        for k in ks:
+            yield x0 + k * dx, y0 + k * dy
+
+    def count_in_region(self, c, constraints):
+        """count_solutions_in_region for this (a, b)."""
+        line = self.line(c)
+        if line is None:
+            return 0
+        x0, y0, dx, dy = line
+        k_low, k_high = None, None
+        for p, q, r in constraints:
+            coef = p * dx + q * dy
+            rhs = r - p * x0 - q * y0
+            if coef > 0:
+                bound = rhs // coef
+                k_high = bound if k_high is None else min(k_high, bound)
+            elif coef < 0:
+                bound = -(rhs // -coef)  # ceil(rhs / coef)
+                k_low = bound if k_low is None else max(k_low, bound)
+            elif rhs < 0:
+                return 0
+        if k_low is None or k_high is None:
+            raise ValueError("infinitely many solutions in the region")
+        return max(0, k_high - k_low + 1)
+
+@lru_cache(maxsize=_SOLVER_CACHE_SIZE)
+def solver(a, b):
+    """The cached DiophantineSolver for (a, b)."""
+    return DiophantineSolver(a, b)
+
+
+# Three variables: a x + b y + c z = n with x1 <= x <= x2, y1 <= y <= y2, z1 <= z <= z2.
+# With g = gcd(a, b), z must satisfy c z = n (mod g), i.e. z = z0 + t sz with sz = g / gcd(c, g);
+# for such z, (x, y) runs over the line of a x + b y = n - c z, where (n - c z) / g = e0 - e1 t.
+# Every solution is then (x, y, z) linear in two integers (t, k), the six box bounds are six
+# half-planes in the (t, k) plane, and floor_sum.count_lattice_polygon counts the lattice points
+# of that polygon in O(log) per edge, instead of one count per z.
+
+def count_solutions3(a, b, c, n, x1, x2, y1, y2, z1, z2):
+    """Number of integer (x, y, z) in the box with a x + b y + c z = n."""
+    if x1 > x2 or y1 > y2 or z1 > z2:
         return 0
     if a == 0 and b == 0:
-        # c == 0 here
-        return (x2 - x1 + 1) * (y2 - y1 + 1)
-    if a == 0:
-        # b y = c
-        if c % b: return 0
-        y = c // b
-        return (x2 - x1 + 1) if y1 <= y <= y2 else 0
-    if b == 0:
-        # a x = c
-        if c % a: return 0
-        x = c // a
-        return (y2 - y1 + 1) if x1 <= x <= x2 else 0
-
-    a_div = a // g
-    b_div = b // g
-
-    # General solution: x = x0 + k * b_div, y = y0 - k * a_div
-    # Constrain x
-    def floor_div(a, b):
-        return a // b if a * b >= 0 else -((-a) // b)
-    def ceil_div(a, b):
-        return a // b if a * b > 0 and a % b == 0 else floor_div(a + b - 1 if b > 0 else a + b + 1, b)
-
-    # For x in [x1,x2]:
-    # x1 <= x0 + k*b_div <= x2
-    if b_div > 0:
-        kx_low = (x1 - x0 + b_div - 1) // b_div
-        kx_high = (x2 - x0) // b_div
-    else:
-        kx_low = (x0 - x2 + (-b_div) - 1) // (-b_div)
-        kx_high = (x0 - x1) // (-b_div)
-
-    # For y in [y1,y2]:
-    # y1 <= y0 - k*a_div <= y2  ->  y0 - y2 <= k*a_div <= y0 - y1
-    if a_div > 0:
-        ky_low = (y0 - y2 + a_div - 1) // a_div
-        ky_high = (y0 - y1) // a_div
-    else:
-        ky_low = (y0 - y1 + (-a_div) - 1) // (-a_div)
-        ky_high = (y0 - y2) // (-a_div)
-
-    k_low = max(kx_low, ky_low)
-    k_high = min(kx_high, ky_high)
-    if k_low > k_high:
+        return count_solutions(c, 0, n, z1, z2, 0, 0) * (x2 - x1 + 1) * (y2 - y1 + 1)
+    S = solver(a, b)
+    g = S.g
+    h = gcd(c, g)
+    if n % h:
         return 0
-    return k_high - k_low + 1
-
+    sz = g // h
+    z0 = n // h * mod_inverse(c // h % sz, sz) % sz
+    e0 = (n - c * z0) // g
+    e1 = c * sz // g
+    _, _, dx, dy = S.line(0)
+    # x = X e0 - X e1 t + dx k,  y = Y e0 - Y e1 t + dy k,  z = z0 + sz t
+    xt, xc = -S.x * e1, S.x * e0
+    yt, yc = -S.y * e1, S.y * e0
+    return count_lattice_polygon((
+        (xt, dx, x2 - xc), (-xt, -dx, xc - x1),
+        (yt, dy, y2 - yc), (-yt, -dy, yc - y1),
+        (sz, 0, z2 - z0), (-sz, 0, z0 - z1),
+    ))
@@ -18,23 +18,16 @@ For n < 2^64 it suffices to test the following bases (if n >= the base):
 Smaller refined minimal sets exist, but this set is fast enough and clear.
 
 Functions:
- - is_probable_prime(n, k=8): probabilistic (random bases) for large n
- - is_prime(n): deterministic for n < 2^64, falls back to probabilistic for larger n
+ - miller_rabin(n, iterations=5): probabilistic (random bases) for large n
+ - is_prime(n): the shared engine in primality.py: table lookup for small n, primorial gcd
+   prefilter, deterministic bases (2, 325, 9375, 28178, 450775, 9780504, 1795265022) for
+   n < 2^64, Baillie-PSW for larger n; is_prime_many(values) for batches
 """
 from random import randrange
-
-def _binpower(base: int, e: int, mod: int) -> int:
-    result = 1
-    base %= mod
-    while e:
-        if e & 1:
-            result = (result * base) % mod
-        base = (base * base) % mod
-        e >>= 1
-    return result
+from primality import is_prime, is_prime_many
 
 def _check_composite(n: int, a: int, d: int, s: int) -> bool:
-    x = _binpower(a, d, n)
+    x = pow(a, d, n)
     if x == 1 or x == n - 1:
         return False
     for _ in range(1, s):
@@ -1,4 +1,8 @@
+from quadratic_ring import QuadraticRing, lucas_uv, sqrt_mod
+from quadratic_ring import fib as _fib_mod
+
 MOD = 998244353
+_RING = QuadraticRing(MOD, 5)  # Z_MOD[sqrt(5)]; any modulus / d: quadratic_ring.QuadraticRing
 
 def modinv(x):
     return pow(x, MOD - 2, MOD)
@@ -32,27 +36,14 @@ class Field:
             invo = modinv(o)
             return Field(self.a * invo, self.b * invo)
     def pow(self, e):
-        r = Field(1, 0)
-        b = self
-        while e:
-            if e & 1:
-                r = r * b
-            b = b * b
-            e >>= 1
-        return r
+        # tuple-based square-and-multiply: no Field is built per step
+        return Field(*_RING.pow((self.a, self.b), e))
 
 # phi = (1 + sqrt(5)) / 2  => coefficients (1/2, 1/2)
 inv2 = (MOD + 1) // 2
 phi = Field(inv2, inv2)
 
 def fib(n: int):
-    if n == 0:
-        return 0
-    a = phi.pow(n)
-    b = (Field(1, 0) - phi).pow(n)
-    num = a - b  # (phi^n - (1 - phi)^n)
-    res = num / Field(0, 1)  # divide by sqrt(5)
-    # result should be purely real
-    assert res.b % MOD == 0
-    return res.a % MOD
-
+    # phi^n = (L_n + F_n sqrt(5)) / 2: the sqrt(5) coefficient alone gives F_n, so (1 - phi)^n
+    # (the conjugate) and the division by sqrt(5) are not needed.
+    return _fib_mod(n, MOD)
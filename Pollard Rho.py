@@ -1,27 +1,34 @@
-import sys, random, math
+import sys
+from factorization import factorize, factorize_many
 """
 Efficient integer factorization utilities combining:
-1. Linear sieve (up to 1_000_000+9) for smallest prime factors (SPF) and quick trial division.
-2. Deterministic Miller–Rabin primality test valid for all 64‑bit unsigned integers.
-3. Pollard’s Rho algorithm (Brent-style cycle detection variant via tortoise–hare) for splitting large composite factors.
-Key components:
-- _sieve(): Precomputes smallest prime factors (SPF) for all numbers < 1e6+9. This enables O(log n) factor extraction per reduced number in that range and accelerates trial division.
-- _is_prime(n): Deterministic Miller–Rabin for n < 2^64 using a proven sufficient base set (2, 325, 9375, 28178, 450775, 9780504, 1795265022).
-- _pollard_rho(n): Randomized Pollard Rho using polynomial f(x)=x^2 + c (mod n) with randomly chosen c and seeds; finds a non-trivial factor with expected time about O(n^{1/4}) for semiprimes of balanced size.
+1. Shared smallest-prime-factor (SPF) table (up to 1_000_000+9, see prime_tables.py) for quick trial division.
+2. Shared primality engine (primality.py): deterministic Miller–Rabin for all 64‑bit unsigned integers, Baillie–PSW above.
+3. Pollard’s Rho algorithm with Brent's cycle detection and batched gcds for splitting composite factors.
+4. Lenstra's elliptic curve method (ECM) as the fallback for ~30+ digit inputs that Rho does not split quickly.
+The core lives in factorization.py (importable, so process pools and other scripts can share it); this file is the CLI.
+Key components (factorization.py):
+- _table(): Shared SPF table for all numbers < 1e6+9, built lazily on first factorization (nothing runs at import). This enables O(log n) factor extraction per reduced number in that range and accelerates trial division.
+- is_prime(n) (primality.py): Deterministic Miller–Rabin for n < 2^64 using a proven sufficient base set (2, 325, 9375, 28178, 450775, 9780504, 1795265022); Baillie–PSW above that.
+- brent_rho(n, c, y) / pollard_rho(n): f(x)=x^2 + c (mod n) with random c and seed; one squaring per step, |x-y| multiplied over 128 steps per gcd, with backtracking when the batched gcd hits n. brent_rho returns (factor or None, steps used); pollard_rho charges those steps to its budget and restarts with a new c and seed when a run cycles. Expected time about O(n^{1/4}) for balanced semiprimes.
+- ecm(n): Montgomery-curve ECM (stage 1 ladder to B1, baby-step/giant-step stage 2 to B2 = 100*B1) with B1 raised along a fixed schedule; the cost depends on the smallest factor, not on n.
 - _factor(n, out): Recursive decomposition combining the above; accumulates prime factors (with multiplicity) into 'out'.
 - factorize(n): Public helper returning an (unsorted) list of prime factors with multiplicity.
+- factorize_many(values, workers=N): Streams sorted factorizations in input order; small primes are stripped from a whole chunk with one product/remainder tree, repeats are factored once, hard cofactors go to a process pool. main() uses it.
 
 Algorithmic notes (Pollard Rho brief theory):
 Pollard’s Rho exploits the birthday paradox on the sequence x_{i+1} = f(x_i) mod n in the ring Z/nZ. For a composite n = p*q, the sequence projected modulo p cycles earlier; gcd(|x_i - x_j|, n) eventually reveals p (or q). Expected time to find a factor roughly ~ O(p^{1/2}) where p is the smaller prime factor; for balanced semiprimes ~ O(n^{1/4}). Random restarts mitigate rare pathological cycles.
+Brent's variant keeps x fixed at the start of blocks of length 1, 2, 4, ... while y runs ahead, so each step is one squaring instead of Floyd's three, and one gcd of the product of |x-y| over a batch replaces one gcd per step.
 Determinism & randomness:
-While Miller–Rabin here is deterministic for 64-bit, Pollard Rho uses randomness for seeds and constants; worst-case behavior is not guaranteed but practically very fast for typical competitive programming constraints.
+While Miller–Rabin here is deterministic for 64-bit, Pollard Rho and ECM use randomness for seeds and curves; worst-case behavior is not guaranteed but practically very fast for typical competitive programming constraints.
 Complexity summary:
-- Sieve preprocessing: O(N log log N) with N ≈ 1e6.
+- Sieve preprocessing: O(N log log N) with N ≈ 1e6, paid once per process on first use (or skipped when mapped from disk).
 - Each factorization:
     * Fast for n < sieve limit (O(log n)).
-    * Otherwise dominated by Pollard Rho splits plus primality tests: empirically sub-millisecond for 64-bit inputs.
+    * Otherwise dominated by Pollard Rho splits plus primality tests: empirically well under 0.1 s for 64-bit inputs.
+    * Above ~2^100, factors up to ~20 digits come from ECM in seconds to about a minute (pure Python).
 Limitations:
-- Designed for 64-bit integers (n < 2^64). Larger integers would need an expanded Miller–Rabin base set or a different strategy.
+- Above 2^64 the primality test is Baillie–PSW (no known counterexample, but not proven).
 - Uses Python's random module (not cryptographically secure).
 - Output formatting includes a trailing space per line (may need adjustment for strict judges).
 Usage example (conceptual):
@@ -29,112 +36,13 @@ Usage example (conceptual):
     sorted_factors = sorted(factors)
 """
 
-_small_primes = []
-_spf_limit = 10**6 + 9
-_spf = [0] * _spf_limit
-
-def _sieve():
-    global _small_primes
-    for i in range(2, _spf_limit):
-        if _spf[i] == 0:
-            _spf[i] = i
-            _small_primes.append(i)
-        j = 0
-        while j < len(_small_primes):
-            p = _small_primes[j]
-            k = i * p
-            if k >= _spf_limit: break
-            _spf[k] = p
-            if p == _spf[i]: break
-            j += 1
-
-_sieve()
-
-# Deterministic Miller-Rabin for 64-bit
-def _is_prime(n: int) -> bool:
-    if n < 2:
-        return False
-    if n < _spf_limit:
-        return _spf[n] == n
-    # quick trial by small primes
-    for p in (2,3,5,7,11,13,17,19,23,29,31,37):
-        if n == p:
-            return True
-        if n % p == 0:
-            return False
-    d = n - 1
-    s = 0
-    while d & 1 == 0:
-        d >>= 1
-        s += 1
-    # bases sufficient for 64-bit
-    for a in (2, 325, 9375, 28178, 450775, 9780504, 1795265022):
-        if a % n == 0:
-            continue
-        x = pow(a, d, n)
-        if x == 1 or x == n - 1:
-            continue
-        for _ in range(s - 1):
-            x = (x * x) % n
-            if x == n - 1:
-                break
-        else:
-            return False
-    return True
-
-def _pollard_rho(n: int) -> int:
-    if n % 2 == 0:
-        return 2
-    if n % 3 == 0:
-        return 3
-    while True:
-        c = random.randrange(1, n)
-        f = lambda x: (pow(x, 2, n) + c) % n
-        x = random.randrange(0, n)
-        y = x
-        d = 1
-        while d == 1:
-            x = f(x)
-            y = f(f(y))
-            d = math.gcd(abs(x - y), n)
-        if d != n:
-            return d
-
-def _factor(n: int, out: list):
-    if n == 1:
-        return
-    if n < _spf_limit:
-        while n > 1:
-            p = _spf[n]
-            out.append(p)
-            n //= p
-        return
-    if _is_prime(n):
-        out.append(n)
-        return
-    d = _pollard_rho(n)
-    _factor(d, out)
-    _factor(n // d, out)
-
-def factorize(n: int):
-    res = []
-    _factor(n, res)
-    return res
-
 def main():
     data = sys.stdin.read().strip().split()
     if not data: 
         return
-    it = iter(data)
-    t = int(next(it))
+    t = int(data[0])
     out_lines = []
-    for _ in range(t):
-        n = int(next(it))
-        if n == 1:
-            out_lines.append("0 ")
-            continue
-        f = factorize(n)
-        f.sort()
+    for f in factorize_many(int(x) for x in data[1:t + 1]):
         line = [str(len(f))] + [str(x) for x in f]
         out_lines.append(" ".join(line) + " ")
     sys.stdout.write("\n".join(out_lines))
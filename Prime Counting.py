@@ -1,83 +1,429 @@
 import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from math import isqrt
+from mobius import mu_range
+from prime_tables import get_table
+from seive import SEGMENT_BYTES, count_primes_upto, iter_primes
 
-# Prime Counting (pi(n)) using Lehmer's algorithm for n up to about 1e16 comfortably.
-# Adjust sieve limit if needed; must be >= n^(2/3) for target max n.
-_SIEVE_LIMIT = 5_000_000  # covers n up to roughly (5e6)^(3/2) ~= 3.5e10; with Lehmer still OK beyond.
-_is_comp = bytearray(_SIEVE_LIMIT + 1)
-primes = []
-pi = [0] * (_SIEVE_LIMIT + 1)
-
-def _sieve():
-    for i in range(2, _SIEVE_LIMIT + 1):
-        if not _is_comp[i]:
-            primes.append(i)
-        pi[i] = pi[i-1] + (0 if _is_comp[i] else 1)
-        for p in primes:
-            k = i * p
-            if k > _SIEVE_LIMIT:
-                break
-            _is_comp[k] = 1
-            if i % p == 0:
-                break
-
-_sieve()
-
-# Cache for phi(x, s) for small s to speed up Lehmer
-_phi_cache = {}
-_SMALL_S_LIMIT = 7  # cache only for small s to save memory
+try:
+    import numpy as np
+except ImportError:  # the pure-Python segment backend below is used instead
+    np = None
 
+# Prime Counting (pi(n)) with the Lagarias-Miller-Odlyzko (LMO) combinatorial method.
+#
+# Theory (notation: p_k is the k-th prime, phi(x, b) counts 1 <= k <= x free of p_1..p_b):
+#   Choose y in [x^(1/3), x^(1/2)], a = pi(y). Then
+#       pi(x) = phi(x, a) + a - 1 - P2(x, a),   P2 = sum_{y < p <= sqrt(x)} (pi(x/p) - pi(p) + 1)
+#   Expanding phi(x, a) with phi(x, b+1) = phi(x, b) - phi(x/p_{b+1}, b) and stopping at n > y:
+#       phi(x, a) = S1 + S2
+#       S1 = sum_{n <= y, squarefree, lpf(n) > p_c}  mu(n) phi(x/n, c)                 (ordinary leaves)
+#       S2 = -sum_{b=c}^{a-1} sum_{y/p_{b+1} < m <= y, lpf(m) > p_{b+1}} mu(m) phi(x/(p_{b+1} m), b)
+#                                                                                        (special leaves)
+#   phi(., c) for c <= 7 comes from one primorial period. A special leaf with v = x/(p_{b+1} m) < p_{b+1}^2
+#   is "easy": phi(v, b) = 1 + max(0, pi(v) - b). Easy leaves with prime m are clustered: all q with the
+#   same pi(x/(p q)) are counted at once. The remaining "hard" leaves (only p_{b+1} < x^(1/4)) and every
+#   pi(v) beyond the shared table are answered offline by ONE segmented sieve sweep over [1, x/y]:
+#   after crossing off p_b in a segment, phi(v, b) = phi(segment start - 1, b) + unsieved count up to v.
+#
+# Complexity: O(x^(2/3) / log x) time for the sweep, O(x^(1/3) log^2 x) memory for the queries.
+# The only cache is phi()'s bounded LRU; nothing grows with the number of queries.
+_SIEVE_LIMIT = 5_000_000  # pi(n) for n <= _SIEVE_LIMIT is a table lookup (shared prime table)
+_TINY_PRIMES = (2, 3, 5, 7, 11, 13, 17)
+_PHI_CACHE_SIZE = 1 << 16
+_NUMPY_MAX = 1 << 56  # vectorized leaves keep every partial sum inside int64 below this
+_GAP_SIEVE = 8  # pi_many: sieve from the previous query when the gap is <= _GAP_SIEVE * sqrt(n)
+
+def _table():
+    # Shared SPF/prime/pi table (prime_tables.py), built on first query instead of at import.
+    return get_table(_SIEVE_LIMIT)
+
+_tiny = []
+
+def _phi_tiny(x: int, c: int) -> int:
+    """phi(x, c) for c <= len(_TINY_PRIMES) from the prefix counts of one primorial period."""
+    if c == 0:
+        return x
+    if not _tiny:
+        period = 1
+        for p in _TINY_PRIMES:
+            period *= p
+            flags = bytearray([1]) * period
+            for q in _TINY_PRIMES[:len(_tiny) + 1]:
+                flags[::q] = bytes(len(range(0, period, q)))
+            counts = array("I", accumulate(flags))
+            _tiny.append((period, counts[-1], counts))
+    period, totient, counts = _tiny[c - 1]
+    q, r = divmod(x, period)
+    return q * totient + counts[r]
+
+@lru_cache(maxsize=_PHI_CACHE_SIZE)
 def phi(x: int, s: int) -> int:
+    """
+    Legendre's phi(x, s): number of 1 <= k <= x not divisible by any of the first s primes.
+    Uses phi(x, s) = phi(x, c) - sum_{c < i <= s} phi(x / p_i, i - 1), the primorial table for s <= 7
+    and pi(x) once p_{s+1}^2 > x. Results are kept in a bounded LRU.
+    """
     if s == 0:
         return x
-    if s == 1:
-        return x - x // 2
-    if s == 2:
-        return x - x // 2 - x // 3 + x // 6
-    if s == 3:
-        return x - x//2 - x//3 - x//5 + x//6 + x//10 + x//15 - x//30  # inclusion-exclusion for primes[0..2]=2,3,5
-    if s < 0:
-        return 0
-    if x == 0:
+    if s < 0 or x == 0:
         return 0
-    if s <= _SMALL_S_LIMIT and x < (1 << 50):
-        key = (x, s)
-        if key in _phi_cache:
-            return _phi_cache[key]
-        res = phi(x, s - 1) - phi(x // primes[s - 1], s - 1)
-        _phi_cache[key] = res
-        return res
-    return phi(x, s - 1) - phi(x // primes[s - 1], s - 1)
+    if s <= len(_TINY_PRIMES):
+        return _phi_tiny(x, s)
+    table = _table()
+    primes = table.primes
+    if x <= table.limit and (s >= len(primes) or x < primes[s] * primes[s]):
+        return 1 + max(0, table.pi(x) - s)
+    c = len(_TINY_PRIMES)
+    res = _phi_tiny(x, c)
+    for i in range(c, s):
+        v = x // primes[i]
+        if v == 0:
+            break
+        res -= phi(v, i)
+    return res
+
+
+class _ByteSegment:
+    """Odd-only sieve segment as a bytearray; prefix counts are scanned incrementally."""
+    __slots__ = ("seg", "zeros")
+
+    def __init__(self, size: int):
+        self.seg = bytearray([1]) * size
+        self.zeros = memoryview(bytes(size))
+
+    def remove(self, i: int, p: int, track: bool) -> int:
+        seg = self.seg
+        removed = seg[i::p].count(1)
+        seg[i::p] = self.zeros[:(len(seg) - 1 - i) // p + 1]
+        return removed
+
+    def signed_counts(self, enc, low: int, exact: bool):
+        """
+        For sorted queries v << 1 | negative with low <= v, return (sum of +-count(v), sum of +-1)
+        where count(v) is the number of unsieved slots for odd numbers in [low, v].
+        """
+        seg = self.seg
+        total = signs = run = prev = 0
+        for q in enc:
+            i = ((q >> 1) - low >> 1) + 1
+            run += seg.count(1, prev, i)
+            prev = i
+            if q & 1:
+                total -= run
+                signs -= 1
+            else:
+                total += run
+                signs += 1
+        return total, signs
+
+
+class _NumpySegment:
+    """
+    Odd-only sieve segment as a uint8 array with per-block counters (BLOCK slots each).
+    While `track` removals run the counters stay exact, so a prefix count is a short cumsum over the
+    counters plus a partial sum inside one block; `exact` (or dense) queries recount the segment once.
+    """
+    __slots__ = ("seg", "blocks", "counts")
+    SHIFT = 6
+
+    def __init__(self, size: int):
+        shift = self.SHIFT
+        nblocks = (size >> shift) + 1
+        self.seg = np.zeros(nblocks << shift, dtype=np.uint8)
+        self.seg[:size] = 1
+        self.blocks = self.seg.reshape(nblocks, 1 << shift)
+        self.counts = self.blocks.sum(axis=1, dtype=np.int64)
+
+    def remove(self, i: int, p: int, track: bool) -> int:
+        view = self.seg[i::p]
+        if track:
+            hits = np.flatnonzero(view)
+            if hits.size:
+                self.counts -= np.bincount((hits * p + i) >> self.SHIFT, minlength=len(self.counts))
+            removed = int(hits.size)
+        else:
+            removed = int(np.count_nonzero(view))
+        view[:] = 0
+        return removed
+
+    def signed_counts(self, enc, low: int, exact: bool):
+        enc = np.asarray(enc, dtype=np.int64)
+        idx = ((enc >> 1) - low) >> 1
+        if exact or len(idx) << self.SHIFT > len(self.seg):
+            counts = np.cumsum(self.seg, dtype=np.int64)[idx]
+        else:
+            blk = idx >> self.SHIFT
+            before = np.concatenate(([0], np.cumsum(self.counts)))[blk]
+            within = np.cumsum(self.blocks[blk], axis=1, dtype=np.int64)
+            counts = before + within[np.arange(len(idx)), idx & ((1 << self.SHIFT) - 1)]
+        sign = 1 - 2 * (enc & 1)
+        return int((sign * counts).sum()), int(sign.sum())
+
+
+def _alpha(x: int) -> int:
+    # y = alpha * x^(1/3): larger y shortens the sweep over [1, x/y] but adds leaves.
+    # Doubling per decade above 1e11 measured best here (2 at 1e12, 8 at 1e14, 16 at 1e15).
+    return 1 << min(5, max(0, (x.bit_length() - 37) // 3))
+
+def _icbrt(n: int) -> int:
+    r = int(round(n ** (1 / 3)))
+    while r * r * r > n:
+        r -= 1
+    while (r + 1) ** 3 <= n:
+        r += 1
+    return r
+
+def _sweep(z: int, primes, hard, pi_queries, k_max: int):
+    """
+    Sieve the odd numbers of [1, z] once, in segments.
+    Queries are encoded as v << 1 | negative and must be sorted.
+    Returns (sum of +-phi(v, b) over hard[b] for every b, sum of +-pi(v) over pi_queries).
+    """
+    segment_cls, size_cap = (_NumpySegment, 1 << 20) if np is not None else (_ByteSegment, 1 << 16)
+    hard_bs = sorted(hard)
+    b_track = hard_bs[-1] if hard_bs else 0
+    ptr = dict.fromkeys(hard_bs, 0)
+    phi_before = dict.fromkeys(hard_bs, 0)
+    phi_before_kmax = 0
+    pi_ptr = 0
+    s2 = pi_sum = 0
+    low = 1
+    while low <= z:
+        size = min(size_cap, (z - low) // 2 + 1)
+        high = low + 2 * size
+        seg = segment_cls(size)
+        seg_count = size
+        for b in range(2, k_max + 1):
+            p = primes[b - 1]
+            start = max(p, low + (-low) % p)
+            if not start & 1:
+                start += p
+            i = (start - low) >> 1
+            if i < size:
+                seg_count -= seg.remove(i, p, b <= b_track)
+            if b in ptr:
+                qs = hard[b]
+                j = ptr[b]
+                k = bisect_left(qs, high << 1, j)
+                if k > j:
+                    total, signs = seg.signed_counts(qs[j:k], low, False)
+                    s2 += total + signs * phi_before[b]
+                    ptr[b] = k
+                phi_before[b] += seg_count
+        k = bisect_left(pi_queries, high << 1, pi_ptr)
+        if k > pi_ptr:
+            total, signs = seg.signed_counts(pi_queries[pi_ptr:k], low, True)
+            pi_sum += total + signs * (phi_before_kmax + k_max - 1)
+            pi_ptr = k
+        phi_before_kmax += seg_count
+        low = high
+    return s2, pi_sum
+
+def _leaves_python(x, y, a, c, table, mu):
+    """Ordinary leaves S1, easy special leaves, hard leaves per b and deferred pi queries (plain loops)."""
+    primes, spf, pi, pi_limit = table.primes, table.spf, table.pi, table.limit
+    p_c = primes[c - 1]
+    s1 = _phi_tiny(x, c)
+    for n in range(2, y + 1):
+        if mu[n] and spf[n] > p_c:
+            s1 += mu[n] * _phi_tiny(x // n, c)
+    s2 = 0
+    hard = {}
+    pi_queries = []
+    for b in range(c, a):
+        p = primes[b]
+        pp = p * p
+        leaves = []
+        if pp > y:
+            # m must be a prime q with max(p, y/p) < q <= y; v = x/(p q) decreases with q.
+            j = max(b + 1, pi(y // p))
+            j_hard = max(j, pi(min(y, x // (pp * p))))
+            leaves.extend((x // (p * primes[i])) << 1 for i in range(j_hard - 1, j - 1, -1))
+            j = j_hard
+            while j < a:
+                v = x // (p * primes[j])
+                if v > pi_limit:
+                    pi_queries.append(v << 1)
+                    s2 += 1 - b
+                    j += 1
+                    continue
+                l = pi(v)
+                if l <= b:
+                    s2 += a - j
+                    break
+                j_end = pi(min(y, x // (p * primes[l - 1])))
+                s2 += (j_end - j) * (l - b + 1)
+                j = j_end
+        else:
+            for m in range(y // p + 1, y + 1):
+                if not mu[m] or spf[m] <= p:
+                    continue
+                v = x // (p * m)
+                if v >= pp:
+                    leaves.append(v << 1 | (mu[m] > 0))
+                elif v > pi_limit:
+                    pi_queries.append(v << 1 | (mu[m] > 0))
+                    s2 -= mu[m] * (1 - b)
+                else:
+                    s2 -= mu[m] * (1 + max(0, pi(v) - b))
+            leaves.reverse()
+        if leaves:
+            hard[b] = leaves
+    return s1, s2, hard, pi_queries
+
+def _leaves_numpy(x, y, a, c, table, mu):
+    """Same as _leaves_python, vectorized per b; pi(v) for v <= table limit is a dense-array gather."""
+    primes, pi, pi_limit = table.primes, table.pi, table.limit
+    P = np.frombuffer(primes, dtype=np.uint32).astype(np.int64)
+    spf = np.frombuffer(table.spf, dtype=np.uint32)
+    is_prime = spf == np.arange(len(spf), dtype=np.uint32)
+    is_prime[:2] = False
+    pi_dense = np.cumsum(is_prime, dtype=np.int32)
+    mu_np = np.frombuffer(mu, dtype=np.int8).astype(np.int64)
+    lpf = np.frombuffer(table.spf, dtype=np.uint32)[:y + 1].astype(np.int64)
+    period, totient, counts = _tiny[c - 1]
+    counts = np.frombuffer(counts, dtype=np.uint32).astype(np.int64)
+    n = np.flatnonzero((mu_np != 0) & (lpf > primes[c - 1]))
+    n = n[n >= 2]
+    q, r = np.divmod(x // n, period)
+    s1 = _phi_tiny(x, c) + int((mu_np[n] * (q * totient + counts[r])).sum())
+    s2 = 0
+    hard = {}
+    pi_queries = []
+    for b in range(c, a):
+        p = primes[b]
+        pp = p * p
+        if pp > y:
+            j = max(b + 1, pi(y // p))
+            if j >= a:
+                continue
+            if x // (p * primes[j]) < p:
+                # every remaining leaf has v < p_{b+1}, so phi(v, b) = 1
+                s2 += a - j
+                continue
+            j_hard = max(j, pi(min(y, x // (pp * p))))
+            v = x // (p * P[j:a])
+            sign = None
+            n_hard = j_hard - j
+        else:
+            lo = y // p + 1
+            m = np.flatnonzero((mu_np[lo:] != 0) & (lpf[lo:] > p)) + lo
+            v = x // (p * m)
+            sign = mu_np[m]
+            n_hard = int(np.count_nonzero(v >= pp))
+        # v is non-increasing: hard leaves first, then easy ones beyond the table, then the rest.
+        if n_hard:
+            enc = v[:n_hard] << 1
+            if sign is not None:
+                enc |= sign[:n_hard] > 0
+            hard[b] = enc[::-1].copy()
+        n_big = n_hard + int(np.count_nonzero(v[n_hard:] > pi_limit))
+        l = np.maximum(pi_dense[v[n_big:]] - b, 0) + 1
+        if sign is None:
+            pi_queries.extend((v[n_hard:n_big] << 1).tolist())
+            s2 += (n_big - n_hard) * (1 - b) + int(l.sum())
+        else:
+            pi_queries.extend(((v[n_hard:n_big] << 1) | (sign[n_hard:n_big] > 0)).tolist())
+            s2 -= int(sign[n_hard:n_big].sum()) * (1 - b) + int((sign[n_big:] * l).sum())
+    return s1, s2, hard, pi_queries
+
+def pi_lmo(x: int) -> int:
+    """pi(x) by the LMO combinatorial method (see header). Exact for any x; practical to ~1e16."""
+    table = _table()
+    if x <= table.limit:
+        return table.pi(x)
+    c = len(_TINY_PRIMES)
+    sqrt_x = isqrt(x)
+    y = min(max(_alpha(x) * _icbrt(x), _icbrt(x) + 1), sqrt_x)
+    z = x // y
+    table = get_table(max(_SIEVE_LIMIT, y, isqrt(z) + 1))
+    pi, pi_limit = table.pi, table.limit
+    a = pi(y)
+    _phi_tiny(0, c)
+    mu = mu_range(y)
+    # Special leaves: easy ones summed now, hard ones and large pi(v) deferred to the sweep.
+    leaves = _leaves_numpy if np is not None and x < _NUMPY_MAX else _leaves_python
+    s1, s2, hard, pi_queries = leaves(x, y, a, c, table, mu)
+
+    # P2: pi(x/p) for y < p <= sqrt(x), with the pi(p) - 1 part in closed form.
+    p2 = 0
+    k = a
+    p_iter = table.primes[a:pi(sqrt_x)] if sqrt_x <= pi_limit else iter_primes(y + 1, sqrt_x)
+    for p in p_iter:
+        k += 1
+        v = x // p
+        p2 -= k - 1
+        if v <= pi_limit:
+            p2 += pi(v)
+        else:
+            pi_queries.append(v << 1 | 1)
+    pi_queries.sort()
+    if np is not None:
+        pi_queries = np.array(pi_queries, dtype=np.int64)
+
+    hard_sum, pi_sum = _sweep(z, table.primes, hard, pi_queries, pi(isqrt(z)))
+    # pi_sum carries +pi(v) for the easy leaves and -pi(v) for P2.
+    return s1 + s2 + hard_sum + pi_sum + a - 1 - p2
+
+# Batch mode (pi_many):
+#   Queries are sorted and deduplicated. Those inside the shared table are one vectorized
+#   searchsorted over its primes. Larger ones are split into runs: a run starts with one pi_lmo
+#   anchor and every later query whose gap to its predecessor is at most _GAP_SIEVE * sqrt(n)
+#   is answered by the same segmented sweep from the anchor (seive.count_primes_upto), so a
+#   window of queries costs one LMO evaluation plus one pass over the window. Separate anchors
+#   still share the grown prime table and phi()'s cache.
+
+def _gap_segment(n: int) -> int:
+    # Segments of ~sqrt(n)/2 odd slots amortize the base-prime loop (capped at 16 MiB).
+    return max(SEGMENT_BYTES, min(1 << 24, 1 << (isqrt(n) >> 1).bit_length()))
+
+def pi_many(ns):
+    """
+    Returns:
+        [pi(n) for n in ns], in the input order, sharing work between queries (see header).
+    """
+    ns = list(ns)
+    queries = sorted(set(ns))
+    table = _table()
+    k = bisect_left(queries, table.limit + 1)
+    small, large = queries[:k], queries[k:]
+    if np is not None and small:
+        primes = np.frombuffer(table.primes, dtype=np.uint32)
+        counts = np.searchsorted(primes, np.array(small, dtype=np.int64), side="right").tolist()
+    else:
+        counts = [table.pi(n) for n in small]
+    answer = dict(zip(small, counts))
+    i = 0
+    while i < len(large):
+        anchor = large[i]
+        j = i + 1
+        while j < len(large) and large[j] - large[j - 1] <= _GAP_SIEVE * isqrt(large[j]):
+            j += 1
+        base = pi_lmo(anchor)
+        answer[anchor] = base
+        run = large[i + 1:j]
+        for n, c in zip(run, count_primes_upto(anchor + 1, run, _gap_segment(large[j - 1]))):
+            answer[n] = base + c
+        i = j
+    return [answer[n] for n in ns]
 
 def lehmer_pi(n: int) -> int:
-    if n <= _SIEVE_LIMIT:
-        return pi[n]
-    # Parameter decomposition
-    a = lehmer_pi(int(n ** (1/4)))
-    b = lehmer_pi(int(n ** 0.5))
-    c = lehmer_pi(int(n ** (1/3)))
-    # First part
-    res = phi(n, a) + (b + a - 2) * (b - a + 1) // 2
-    # Main correction loop
-    for i in range(a + 1, b + 1):
-        p = primes[i - 1]
-        w = n // p
-        res -= lehmer_pi(w)
-        if i <= c:
-            lim = lehmer_pi(int(w ** 0.5))
-            for j in range(i, lim + 1):
-                res -= lehmer_pi(w // primes[j - 1]) - (j - 1)
-    return res
+    """pi(n); kept under its old name for callers, now backed by pi_lmo."""
+    if n < 2:
+        return 0
+    return pi_lmo(n)
 
 def main():
     data = sys.stdin.read().strip().split()
     if not data:
         return
     q = int(data[0])
-    out = []
-    for i in range(1, q + 1):
-        n = int(data[i])
-        out.append(str(lehmer_pi(n)))
-    sys.stdout.write("\n".join(out))
+    out = pi_many(int(n) for n in data[1:q + 1])
+    sys.stdout.write("\n".join(map(str, out)))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
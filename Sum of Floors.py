@@ -1,5 +1,12 @@
+from functools import partial
+from floor_blocks import INT64, floor_blocks, harmonic_sum, harmonic_sum_many, triangular
+from floor_sum import count_under_line, floor_power_sums, floor_sum
+
 MOD = 10**9 + 7
 
+def _identity(q):
+    return q
+
 def weighted_floor_sum(n: int, mod: int = MOD) -> int:
     """
     Computes S = sum_{i=1..n} i * floor(n / i) modulo mod.
@@ -10,13 +17,16 @@ def weighted_floor_sum(n: int, mod: int = MOD) -> int:
     Over that block, floor(n / i) = q is constant.
     So contribution = q * sum_{i=L}^{R} i = q * (R - L + 1)*(L + R)//2.
     Advancing by blocks gives O(sqrt n) complexity because q changes only ~2*sqrt(n) times.
+    The blocks come from floor_blocks.py (one vectorized pass with numpy).
     """
-    total = 0
-    i = 1
-    while i <= n:
-        q = n // i
-        r = n // q
-        block_sum = (r - i + 1) * (i + r) // 2
-        total = (total + q * block_sum) % mod
-        i = r + 1
-    return total
+    return harmonic_sum(n, _identity, partial(triangular, mod=mod), mod, INT64)
+
+
+def weighted_floor_sum_many(ns, mod: int = MOD):
+    """weighted_floor_sum for every n in ns, all blocks evaluated in one pass."""
+    return harmonic_sum_many(ns, _identity, partial(triangular, mod=mod), mod, INT64)
+
+
+# Linear floors sum_{i<n} floor((a i + b) / m), their i / i^2 / floor^2 weighted versions and
+# lattice points under a line, in O(log) for arbitrary-size inputs: floor_sum, floor_power_sums
+# and count_under_line, re-exported above from floor_sum.py.
@@ -0,0 +1,191 @@
+import os
+import sys
+from math import isqrt
+from time import perf_counter
+
+# Benchmarks for the number theory templates.
+# Usage: python benchmarks.py <name> [args...]   (no name: list available benchmarks)
+
+
+def _timed(fn, *args, **kwargs):
+    start = perf_counter()
+    result = fn(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def bench_parallel_sieve(n: int = 10**9):
+    """
+    Prime counting over [1, n] with seive.count_primes on 1, 2, 4, ... workers up to cpu_count.
+    Prints wall time and speedup relative to the single-core engine.
+    """
+    import seive
+    cores = os.cpu_count() or 1
+    base_count, base_time = _timed(seive.count_primes, 1, n)
+    print(f"count_primes(1, {n}) = {base_count}")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {base_time:>10.3f} {1.0:>8.2f}")
+    for workers in sorted({1 << k for k in range(cores.bit_length())} | {cores}):
+        count, elapsed = _timed(seive.count_primes, 1, n, workers=workers)
+        assert count == base_count
+        print(f"{workers:>8} {elapsed:>10.3f} {base_time / elapsed:>8.2f}")
+
+
+def bench_pi_many(n: int = 10**12, window: int = 10**8):
+    """
+    pi_many on batches of 1, 10, 100, 1000 random queries in [n, n + window].
+    Prints batch time and time per query (sublinear growth means work is shared).
+    """
+    import importlib.util
+    import random
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Prime Counting.py")
+    spec = importlib.util.spec_from_file_location("prime_counting", path)
+    prime_counting = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(prime_counting)
+    rng = random.Random(1)
+    print(f"{'queries':>8} {'seconds':>10} {'per query':>10}")
+    for q in (1, 10, 100, 1000):
+        xs = [n + rng.randrange(window + 1) for _ in range(q)]
+        _, elapsed = _timed(prime_counting.pi_many, xs)
+        print(f"{q:>8} {elapsed:>10.3f} {elapsed / q:>10.4f}")
+
+
+def bench_factorize_many(count: int = 20000, bits: int = 64):
+    """
+    Factor `count` random `bits`-bit integers: one factorize() call per value versus
+    factorization.factorize_many on 1, 2, 4, ... workers up to cpu_count.
+    """
+    import random
+    import factorization
+    rng = random.Random(1)
+    values = [rng.getrandbits(bits) for _ in range(count)]
+    cores = os.cpu_count() or 1
+    _, base_time = _timed(lambda: [factorization.factorize(n) for n in values])
+    print(f"{'mode':>12} {'seconds':>10} {'speedup':>8}")
+    print(f"{'loop':>12} {base_time:>10.3f} {1.0:>8.2f}")
+    for workers in sorted({1 << k for k in range(cores.bit_length())} | {cores}):
+        _, elapsed = _timed(lambda: list(factorization.factorize_many(values, workers=workers)))
+        print(f"{'many x' + str(workers):>12} {elapsed:>10.3f} {base_time / elapsed:>8.2f}")
+
+
+def bench_primality(count: int = 20000, bits: int = 64):
+    """
+    Test `count` random odd `bits`-bit integers with primality.is_prime / is_prime_many
+    against the older per-script tests (random-base Miller-Rabin, Fermat).
+    """
+    import importlib.util
+    import random
+    import fermats_primality_test
+    import primality
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Miller-Rabin primality test.py")
+    spec = importlib.util.spec_from_file_location("miller_rabin", path)
+    miller_rabin = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(miller_rabin)
+    rng = random.Random(1)
+    values = [rng.getrandbits(bits) | 1 for _ in range(count)]
+    primality.is_prime(3)
+    candidates = [
+        ("is_prime", lambda: [primality.is_prime(n) for n in values]),
+        ("is_prime_many", lambda: primality.is_prime_many(values)),
+        ("miller_rabin", lambda: [miller_rabin.miller_rabin(n) for n in values]),
+        ("fermat", lambda: [fermats_primality_test.fermat_primality_test(n) for n in values]),
+    ]
+    if primality.np is not None and bits <= 64:
+        packed = primality.np.array(values, dtype=primality.np.uint64)
+        candidates.insert(2, ("is_prime_array", lambda: primality.is_prime_array(packed)))
+    print(f"{'function':>14} {'seconds':>10} {'primes':>8}")
+    for name, fn in candidates:
+        result, elapsed = _timed(fn)
+        print(f"{name:>14} {elapsed:>10.3f} {sum(result):>8}")
+
+
+def bench_prefix_sums(n: int = 10**11, mod: int = 10**9 + 7):
+    """
+    sum_{i <= n} f(i) mod `mod` for the multiplicative presets by min_25
+    (multiplicative.prefix_sum), the Mertens value M(n) alongside for scale.
+    """
+    import mobius
+    import multiplicative
+    print(f"{'function':>8} {'seconds':>10} {'value':>12}")
+    for f in (multiplicative.SIGMA0, multiplicative.SIGMA1, multiplicative.PHI, multiplicative.MU):
+        value, elapsed = _timed(lambda: multiplicative.prefix_sum(f, n, mod))
+        print(f"{f.name:>8} {elapsed:>10.3f} {value:>12}")
+    value, elapsed = _timed(lambda: mobius.mertens(n))
+    print(f"{'mertens':>8} {elapsed:>10.3f} {value:>12}")
+
+
+def bench_harmonic_sum(n: int = 10**12, count: int = 10000, mod: int = 10**9 + 7):
+    """
+    sum_{i <= n} i * floor(n / i) mod `mod`: a hand-written block loop against
+    floor_blocks.harmonic_sum, then `count` n up to sqrt(n) one by one against harmonic_sum_many.
+    """
+    import floor_blocks
+
+    def loop():
+        total, l = 0, 1
+        while l <= n:
+            q = n // l
+            r = n // q
+            total = (total + q * ((r - l + 1) * (l + r) // 2)) % mod
+            l = r + 1
+        return total
+
+    ident = lambda q: q
+    tri = lambda x: floor_blocks.triangular(x, mod)
+    ns = [isqrt(n) // count * k for k in range(1, count + 1)]
+    candidates = [
+        ("while-loop", loop),
+        ("harmonic_sum", lambda: floor_blocks.harmonic_sum(n, ident, tri, mod, floor_blocks.INT64)),
+        ("one by one", lambda: sum(floor_blocks.harmonic_sum(v, ident, tri, mod, floor_blocks.INT64)
+                                   for v in ns) % mod),
+        ("harmonic_sum_many", lambda: sum(floor_blocks.harmonic_sum_many(ns, ident, tri, mod, floor_blocks.INT64))
+                                      % mod),
+    ]
+    print(f"{'function':>18} {'seconds':>10} {'value':>12}")
+    for name, fn in candidates:
+        value, elapsed = _timed(fn)
+        print(f"{name:>18} {elapsed:>10.3f} {value:>12}")
+
+
+def bench_recurrence(k: int = 1000, n: int = 10**18, count: int = 20):
+    """
+    Order-k random recurrence mod 998244353: Berlekamp-Massey on 2k terms, then a_n by Bostan-Mori
+    and Kitamasa, and count nearby n with nth_terms.
+    """
+    import random
+    import linear_recurrence as lr
+    p = lr.NTT_MOD
+    rng = random.Random(1)
+    coeffs = [rng.randrange(p) for _ in range(k)]
+    seq = [rng.randrange(p) for _ in range(k)]
+    while len(seq) < 2 * k:
+        seq.append(sum(c * a for c, a in zip(coeffs, reversed(seq[-k:]))) % p)
+    found, elapsed = _timed(lr.berlekamp_massey, seq)
+    assert found == coeffs
+    print(f"berlekamp_massey({2 * k} terms) {elapsed:.3f}s")
+    value, elapsed = _timed(lr.nth_term, coeffs, seq, n)
+    print(f"nth_term(n={n}) = {value}  {elapsed:.3f}s")
+    values, elapsed = _timed(lr.nth_terms, coeffs, seq, range(n, n + count))
+    assert values[0] == value
+    print(f"nth_terms({count} queries) {elapsed:.3f}s")
+
+
+BENCHMARKS = {
+    "sieve": bench_parallel_sieve,
+    "pi_many": bench_pi_many,
+    "factorize": bench_factorize_many,
+    "primality": bench_primality,
+    "prefix_sums": bench_prefix_sums,
+    "harmonic_sum": bench_harmonic_sum,
+    "recurrence": bench_recurrence,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("available:", " ".join(BENCHMARKS))
+        return
+    BENCHMARKS[sys.argv[1]](*(int(a) for a in sys.argv[2:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Divisor functions: tau(n) = sigma_0(n) (number of divisors), sigma_k(n) = sum_{d | n} d^k.
+
+    sigma_k(p^e) = 1 + p^k + p^2k + ... + p^ek,   multiplicative in n
+
+Single values / many large n:
+factor_counts(n)            ((p, e), ...) from the shared factorizer, memoized in an LRU, so
+                            tau, sigma and divisors of a repeated n share one factorization
+tau(n), sigma(n, k)         prime_power of the sigma_k Multiplicative (multiplicative.SIGMA0,
+                            SIGMA1, ...) multiplied over factor_counts(n)
+sigma_many(values, k)       one batch factorization (factorization.factorize_many) for all values
+divisors(n)                 every divisor of n in increasing order, lazily: a heap of divisors
+                            where each d = ... * p_j^e_j (p_j its largest prime) has the children
+                            d * p_j (if e_j < E_j) and d * p_i (i > j), so each divisor is pushed
+                            exactly once; O(log tau(n)) per divisor, memory O(tau(n)) at worst
+
+Ranges:
+sigma_range(limit, k)       sigma_k(0..limit) into a typed array (array('I') for tau, 'Q' while the
+tau_range(limit)            values fit, else a list); sigma_k(0) = 0
+iter_sigma_segments(l, r, k) (lo, values) segment by segment, for reports over ranges too large
+                            to hold (1e8 values of array('Q') are 800 MB)
+
+Segment: res = 1, rem = n. For each prime p <= sqrt(r), the multiples of p^j get p^jk added to
+their p-part t (so t = sigma_k(p^e) for the exact power p^e), res is multiplied by t and p is
+divided out of rem. The one prime q > sqrt(r) left in rem multiplies res by 1 + q^k.
+O((r - l) log log r + sqrt(r)) per window; numpy vectorizes each pass. Without numpy the range
+functions use the linear sieve of multiplicative.table instead.
+Nothing is computed at import.
+"""
+from array import array
+from functools import lru_cache
+from heapq import heappop, heappush
+from math import isqrt
+from factorization import factorize, factorize_many
+from multiplicative import SIGMA0, SIGMA1, Multiplicative, table
+from seive import iter_primes
+
+try:
+    import numpy as np
+except ImportError:  # the range functions use the linear sieve instead
+    np = None
+
+_FACTOR_CACHE_SIZE = 1 << 16
+_SEGMENT = 1 << 18
+_INT64_MAX = (1 << 63) - 1
+_SIGMA_PRESETS = {0: SIGMA0, 1: SIGMA1}  # k -> sigma_k, the others built on first use
+
+def _counts(factors):
+    """Sorted factor list -> ((p, e), ...)."""
+    out = []
+    for p in factors:
+        if out and out[-1][0] == p:
+            out[-1][1] += 1
+        else:
+            out.append([p, 1])
+    return tuple((p, e) for p, e in out)
+
+@lru_cache(maxsize=_FACTOR_CACHE_SIZE)
+def factor_counts(n: int):
+    """Returns ((p1, e1), (p2, e2), ...) with p1 < p2 < ... for n >= 1."""
+    if n < 1:
+        raise ValueError("n must be positive")
+    return _counts(sorted(factorize(n)))
+
+def _sigma_preset(k: int) -> Multiplicative:
+    """sigma_k as a Multiplicative (SIGMA0, SIGMA1 for k = 0, 1), built once per k."""
+    f = _SIGMA_PRESETS.get(k)
+    if f is None:
+        f = _SIGMA_PRESETS[k] = Multiplicative(
+            "sigma%d" % k, lambda p, e: (p ** (k * (e + 1)) - 1) // (p ** k - 1),
+            (1,) + (0,) * (k - 1) + (1,))
+    return f
+
+def _sigma_from_counts(counts, k: int) -> int:
+    prime_power = _sigma_preset(k).prime_power
+    res = 1
+    for p, e in counts:
+        res *= prime_power(p, e)
+    return res
+
+def tau(n: int) -> int:
+    """Number of positive divisors of n >= 1."""
+    return _sigma_from_counts(factor_counts(n), 0)
+
+def sigma(n: int, k: int = 1) -> int:
+    """sigma_k(n) = sum of d^k over the divisors d of n >= 1."""
+    return _sigma_from_counts(factor_counts(n), k)
+
+def sigma_many(values, k: int = 1, workers: int = 1):
+    """Returns [sigma(n, k) for n in values] with the factorizations done as one batch."""
+    values = list(values)
+    if any(n < 1 for n in values):
+        raise ValueError("n must be positive")
+    return [_sigma_from_counts(_counts(f), k) for f in factorize_many(values, workers=workers)]
+
+def divisors(n: int):
+    """Yields the divisors of n >= 1 in increasing order (lazily)."""
+    counts = factor_counts(n)
+    heap = [(1, -1, 0)]  # (d, index of the largest prime of d, its exponent)
+    while heap:
+        d, j, e = heappop(heap)
+        yield d
+        if j >= 0 and e < counts[j][1]:
+            heappush(heap, (d * counts[j][0], j, e + 1))
+        for i in range(j + 1, len(counts)):
+            heappush(heap, (d * counts[i][0], i, 1))
+
+def _value_bound(limit: int, k: int) -> int:
+    """Upper bound for sigma_k(n), n <= limit: tau(n) <= 2 sqrt(n), sigma_1(n) / n <= H_n, else < 2 n^k."""
+    if k == 0:
+        return 2 * isqrt(limit) + 2
+    return limit ** k * (limit.bit_length() if k == 1 else 2)
+
+def _segment_numpy(lo: int, hi: int, primes, k: int):
+    """sigma_k(lo..hi-1) as an int64 array (sigma_k(0) = 0)."""
+    size = hi - lo
+    res = np.ones(size, dtype=np.int64)
+    rem = np.arange(lo, hi, dtype=np.int64)
+    for p in primes:
+        if p * p >= hi:
+            break
+        start = -lo % p
+        if start >= size:
+            continue
+        t = np.ones(len(range(start, size, p)), dtype=np.int64)
+        pj, term = p, p ** k
+        while pj < hi:
+            s = -lo % pj
+            if s >= size:
+                break
+            t[(s - start) // p::pj // p] += term
+            rem[s::pj] //= p
+            pj *= p
+            term *= p ** k
+        res[start::p] *= t
+    big = rem > 1
+    res[big] *= (1 + rem[big] ** k) if k else 2
+    if lo == 0:
+        res[0] = 0
+    return res
+
+def _segment_python(lo: int, hi: int, primes, k: int):
+    """sigma_k(lo..hi-1) as a list (sigma_k(0) = 0)."""
+    size = hi - lo
+    res = [1] * size
+    rem = list(range(lo, hi))
+    for p in primes:
+        if p * p >= hi:
+            break
+        start = -lo % p
+        t = [1] * len(range(start, size, p))
+        pj, term = p, p ** k
+        while pj < hi:
+            s = -lo % pj
+            if s >= size:
+                break
+            step = pj // p
+            i0 = (s - start) // p
+            t[i0::step] = [v + term for v in t[i0::step]]
+            rem[s::pj] = [v // p for v in rem[s::pj]]
+            pj *= p
+            term *= p ** k
+        res[start::p] = [a * b for a, b in zip(res[start::p], t)]
+    res = [v * (q ** k + 1 if k else 2) if q > 1 else v for v, q in zip(res, rem)]
+    if lo == 0 and size:
+        res[0] = 0
+    return res
+
+def iter_sigma_segments(l: int, r: int, k: int = 1, segment: int = _SEGMENT):
+    """Yields (lo, values) with values[i] = sigma_k(lo + i), covering [l, r] in increasing order."""
+    l = max(l, 0)
+    if r < l:
+        return
+    primes = list(iter_primes(2, isqrt(r)))
+    vectorized = np is not None and _value_bound(r, k) <= _INT64_MAX
+    for lo in range(l, r + 1, segment):
+        hi = min(lo + segment, r + 1)
+        yield lo, _segment_numpy(lo, hi, primes, k) if vectorized else _segment_python(lo, hi, primes, k)
+
+def sigma_range(limit: int, k: int = 1):
+    """
+    Returns:
+        sigma_k(0..limit) (sigma_k(0) = 0) as array('I') for k = 0, array('Q') while the values
+        fit in 64 bits, a list otherwise
+    """
+    wide = _value_bound(limit, k) >= 1 << 64
+    typecode = "I" if k == 0 else "Q"
+    if np is None:
+        values = table(_sigma_preset(k), limit)
+        return values if wide else array(typecode, values)
+    out = [] if wide else array(typecode)
+    for _, values in iter_sigma_segments(0, limit, k):
+        if isinstance(values, list):
+            out.extend(values)
+        else:
+            out.frombytes(values.astype(np.uint32 if k == 0 else np.uint64).tobytes())
+    return out
+
+def tau_range(limit: int):
+    """Returns tau(0..limit) as array('I') (tau(0) = 0)."""
+    return sigma_range(limit, 0)
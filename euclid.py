@@ -0,0 +1,167 @@
+"""
+Extended Euclid engine shared by CRT.py, Linear Congrunce.py and Linear Diophantine Eqn.py.
+
+extended_gcd(a, b)          (g, x, y) with a x + b y = g = gcd(a, b) >= 0, iterative
+mod_inverse(a, m)           a^-1 mod m, ValueError if gcd(a, m) != 1
+extended_gcd_many(pairs)    extended_gcd for many pairs (numpy columns when every value < 2^62)
+extended_gcd_arrays(a, b)   the same on numpy int64 arrays of values in [0, 2^62): (g, x, y) arrays
+inverse_many(values, m)     [v^-1 mod m for v in values] with one inversion (Montgomery's trick)
+
+Plain loop: only the cofactor of a is carried through the quotients, y = (g - a x) / b at the
+end. For nonnegative a, b the result is the one of the textbook recursion, |x| <= b / 2g.
+
+Large operands (both above _HGCD_MIN bits): half-gcd. The leading quotients of Euclid's
+algorithm only depend on the leading bits, so the cofactor matrix that takes (a, b) from n bits
+down to n/2 is computed from the top halves, recursively (Lehmer's idea applied to whole halves
+instead of machine words), and applied to the full numbers with a few big multiplications:
+O(M(n) log n) instead of O(n^2). A matrix computed from truncated values may be slightly off
+near its end; signs and order are fixed up (the matrix stays unimodular, so the gcd is kept) and
+exact Euclid steps finish each level. The x of this path is reduced into [0, b / g).
+
+Batch inversion: with prefix products p_i = v_0 ... v_{i-1} and t = (v_0 ... v_{k-1})^-1,
+walking back v_i^-1 = t p_i and t <- t v_i: one inversion and 3k multiplications mod m.
+"""
+try:
+    import numpy as np
+except ImportError:  # extended_gcd_many loops over the pairs
+    np = None
+
+_HGCD_MIN = 1 << 11  # bits; below this the plain loop wins
+_NUMPY_MAX = 1 << 62
+
+def _plain(a: int, b: int):
+    """(g, x) with a x = g (mod b), a, b >= 0."""
+    x0, x1 = 1, 0
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+    return a, x0
+
+def _reduce(a: int, b: int, h: int):
+    """
+    Euclid steps on a >= b >= 0 until b < 2^h.
+    Returns:
+        (a', b', (u0, v0, u1, v1)) with a' = u0 a + v0 b, b' = u1 a + v1 b, a' >= b' >= 0
+    """
+    u0, v0, u1, v1 = 1, 0, 0, 1
+    while b >> h:
+        k = a.bit_length() - h  # excess bits
+        if k > _HGCD_MIN // 2 and b.bit_length() > h + k // 2 + 2:
+            # the matrix that halves the excess comes from the top k bits of a (and b)
+            _, _, (p0, q0, p1, q1) = _reduce(a >> h, b >> h, k // 2 + 2)
+            if (p0, q0, p1, q1) != (1, 0, 0, 1):
+                a, b = p0 * a + q0 * b, p1 * a + q1 * b
+                if a < 0:
+                    a, p0, q0 = -a, -p0, -q0
+                if b < 0:
+                    b, p1, q1 = -b, -p1, -q1
+                if a < b:
+                    a, b, p0, q0, p1, q1 = b, a, p1, q1, p0, q0
+                u0, v0, u1, v1 = (p0 * u0 + q0 * u1, p0 * v0 + q0 * v1,
+                                  p1 * u0 + q1 * u1, p1 * v0 + q1 * v1)
+                continue
+        # short excess, a large quotient or no progress from the top bits: one exact step
+        q, r = divmod(a, b)
+        a, b = b, r
+        u0, u1 = u1, u0 - q * u1
+        v0, v1 = v1, v0 - q * v1
+    return a, b, (u0, v0, u1, v1)
+
+def extended_gcd(a: int, b: int):
+    """Returns (g, x, y) with a x + b y = g = gcd(a, b) >= 0."""
+    A, B = abs(a), abs(b)
+    if min(A, B).bit_length() <= _HGCD_MIN:
+        g, x = _plain(A, B)
+    else:
+        swap = A < B
+        r0, r1 = (B, A) if swap else (A, B)
+        x0, x1 = 1, 0  # cofactors of the larger input: r0 = x0 R0 (mod R1), r1 = x1 R0
+        while r1.bit_length() > _HGCD_MIN:
+            h = r0.bit_length() // 2
+            if r1 >> h:
+                r0, r1, (u0, v0, u1, v1) = _reduce(r0, r1, h)
+                x0, x1 = u0 * x0 + v0 * x1, u1 * x0 + v1 * x1
+            else:  # unbalanced: one long division first
+                q, r = divmod(r0, r1)
+                r0, r1 = r1, r
+                x0, x1 = x1, x0 - q * x1
+        g, t = _plain(r0, r1)
+        if r1:
+            # g = t r0 + s r1 with s = (g - t r0) / r1
+            s = (g - t * r0) // r1
+            x0 = t * x0 + s * x1
+        # now x0 is the cofactor of the larger input; go to the cofactor of A
+        if swap:
+            x = (g - x0 * B) // A  # cofactor of A from the cofactor of B
+        else:
+            x = x0
+        x %= B // g
+    y = (g - A * x) // B if B else 0
+    if a < 0:
+        x = -x
+    if b < 0:
+        y = -y
+    return g, x, y
+
+def mod_inverse(a: int, m: int) -> int:
+    """a^-1 mod m (m >= 1); raises ValueError if gcd(a, m) != 1."""
+    if m.bit_length() <= _HGCD_MIN:
+        try:
+            return pow(a, -1, m)
+        except ValueError:
+            raise ValueError("%d is not invertible mod %d" % (a, m)) from None
+    g, x, _ = extended_gcd(a % m, m)
+    if g != 1:
+        raise ValueError("%d is not invertible mod %d" % (a, m))
+    return x % m
+
+def extended_gcd_arrays(a, b):
+    """(g, x, y) int64 arrays with a x + b y = g = gcd(a, b), elementwise (0 <= a, b < 2^62)."""
+    a = np.array(a, dtype=np.int64)
+    b = np.array(b, dtype=np.int64)
+    g, x, y = a.copy(), np.ones_like(a), np.zeros_like(a)  # final values of the rows with b = 0
+    idx = np.flatnonzero(b)  # rows still running, as compact working arrays
+    a, b = a[idx], b[idx]
+    x0, x1 = np.ones_like(a), np.zeros_like(a)
+    y0, y1 = np.zeros_like(a), np.ones_like(a)
+    while idx.size:
+        q, r = np.divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+        done = r == 0
+        if done.any():
+            rows = idx[done]
+            g[rows], x[rows], y[rows] = a[done], x0[done], y0[done]
+            keep = ~done
+            idx, a, b, x0, x1, y0, y1 = (v[keep] for v in (idx, a, b, x0, x1, y0, y1))
+    return g, x, y
+
+def extended_gcd_many(pairs):
+    """Returns [extended_gcd(a, b) for a, b in pairs]."""
+    pairs = list(pairs)
+    if np is None or not pairs or not all(0 <= a < _NUMPY_MAX and 0 <= b < _NUMPY_MAX
+                                          for a, b in pairs):
+        return [extended_gcd(a, b) for a, b in pairs]
+    g, x, y = extended_gcd_arrays([a for a, _ in pairs], [b for _, b in pairs])
+    return list(zip(g.tolist(), x.tolist(), y.tolist()))
+
+def inverse_many(values, m: int):
+    """[v^-1 mod m for v in values]; raises ValueError naming a value that is not invertible."""
+    values = [v % m for v in values]
+    prefix = []
+    acc = 1 % m
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % m
+    try:
+        t = mod_inverse(acc, m)
+    except ValueError:
+        bad = next(v for v in values if extended_gcd(v, m)[0] != 1)
+        raise ValueError("%d is not invertible mod %d" % (bad, m)) from None
+    out = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        out[i] = t * prefix[i] % m
+        t = t * values[i] % m
+    return out
@@ -0,0 +1,372 @@
+"""
+Integer factorization core shared by the factoring scripts (see "Pollard Rho.py").
+
+Strategy for factor(n), applied recursively to every split:
+    n < _SPF_LIMIT          smallest-prime-factor table lookups (prime_tables.py), O(log n)
+    n prime                 primality.is_prime (deterministic Miller-Rabin below 2^64, BPSW above)
+    otherwise               Brent's rho; inputs of _ECM_MIN_BITS bits or more get a bounded
+                            rho budget and then Lenstra ECM with growing B1
+
+Brent's rho (f(x) = x^2 + c mod n):
+    The hare y runs ahead in blocks of r = 1, 2, 4, ... steps while x stays at the block start,
+    so each step costs one modular squaring (Floyd needs three). The |x - y| values are multiplied
+    into q for _RHO_BATCH steps before one gcd(q, n). If that gcd is n (several factors collided
+    inside one batch) the batch is replayed from its saved start one gcd at a time.
+
+Lenstra ECM (Montgomery curves By^2 = x^3 + Ax^2 + x, Suyama parametrization, XZ coordinates):
+    Stage 1 multiplies a random point by every prime power <= B1 with the Montgomery ladder; a
+    factor p appears in gcd(Z, n) when the curve order mod p is B1-smooth. Stage 2 catches one
+    extra prime q in (B1, B2] with the baby-step/giant-step continuation: with R = rQ and
+    S_d = 2dQ, X_R Z_S - X_S Z_R vanishes mod p when (r + 2d)Q = O, and the products are
+    accumulated into one gcd per curve. The expected work depends on the size of p, not of n.
+
+Batch mode (factorize_many), per chunk of _BATCH inputs:
+    1. Deduplicate, then build a product tree over the distinct inputs and push P (the product of
+       all primes <= _TRIAL_LIMIT) down it as a remainder tree: P mod n_i for every input at the
+       cost of a few big multiplications instead of one trial division per (input, prime).
+    2. g_i = gcd(P mod n_i, n_i) is the product of the small primes dividing n_i; they are read off
+       by descending a product tree of the primes with gcds, then divided out.
+    3. A cofactor below _TRIAL_LIMIT^2 is 1 or prime. The rest (deduplicated again) go to a process
+       pool in sub-chunks; up to _BATCHES_IN_FLIGHT chunks are in flight and results are yielded in
+       input order.
+"""
+import os
+import random
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from math import gcd
+from prime_tables import get_table
+from primality import is_prime
+
+_SPF_LIMIT = 10**6 + 9
+_RHO_BATCH = 128        # steps multiplied together per gcd in Brent's rho
+_ECM_MIN_BITS = 100     # ~30 digits: rho gets a budget, then ECM takes over
+_RHO_BUDGET = 1 << 16   # rho steps tried on such inputs before the first ECM curve
+_ECM_SCHEDULE = ((2000, 25), (11000, 90), (50000, 300), (250000, 700), (1000000, 1800))  # (B1, curves)
+_ECM_D = 105            # stage 2 giant step is 2*_ECM_D
+
+_TRIAL_LIMIT = 1 << 12  # factorize_many strips primes up to here (larger bounds cost more in the descent than rho saves)
+_BATCH = 4096
+_BATCHES_IN_FLIGHT = 2
+
+def _table():
+    # Shared SPF table, built on first use (or mmap'd from PRIME_TABLE_PATH).
+    return get_table(_SPF_LIMIT)
+
+def brent_rho(n: int, c: int, y: int, budget=None):
+    """
+    One run of Brent's rho with f(x) = x^2 + c from seed y.
+    Returns:
+        (d, steps): d a non-trivial factor of n, or None if the run cycled (gcd n) or would pass
+        `budget` steps; steps the number of iterations of f actually done
+    """
+    m = _RHO_BATCH
+    g = r = q = 1
+    steps = 0
+    while g == 1:
+        if budget is not None and steps + r >= budget:
+            return None, steps
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        steps += r
+        k = 0
+        while k < r and g == 1:
+            if budget is not None and steps >= budget:
+                return None, steps
+            ys = y
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * (x - y) % n
+            g = gcd(q, n)
+            steps += min(m, r - k)
+            k += m
+        r <<= 1
+    if g == n:
+        # Backtrack: redo the last batch one step at a time.
+        while True:
+            ys = (ys * ys + c) % n
+            steps += 1
+            g = gcd(x - ys, n)
+            if g > 1:
+                break
+    return (g if g != n else None), steps
+
+def pollard_rho(n: int, budget=None):
+    """
+    Returns:
+        a non-trivial factor of composite n, or None once `budget` steps are spent; a run that
+        cycles is charged the steps it did and restarted with a new c and seed
+    """
+    if n % 2 == 0:
+        return 2
+    if n % 3 == 0:
+        return 3
+    spent = 0
+    while budget is None or spent < budget:
+        run = None if budget is None else budget - spent
+        d, steps = brent_rho(n, random.randrange(1, n - 1), random.randrange(0, n), run)
+        if d is not None:
+            return d
+        spent += steps
+    return None
+
+# --- Lenstra ECM ---
+
+def _small_primes(limit: int):
+    table = get_table(max(limit, _SPF_LIMIT))
+    return table.primes[:table.pi(limit)]
+
+def _xdbl(x, z, a24, n):
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+def _xadd(xp, zp, xq, zq, xd, zd, n):
+    # P + Q from P, Q and their difference P - Q = (xd : zd).
+    u = (xp - zp) * (xq + zq)
+    v = (xp + zp) * (xq - zq)
+    return zd * (u + v) * (u + v) % n, xd * (u - v) * (u - v) % n
+
+def _ladder(k, x, z, a24, n):
+    """kP for k >= 1 by the Montgomery ladder (only X:Z coordinates)."""
+    x1, z1 = x, z
+    x2, z2 = _xdbl(x, z, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x1, z1 = _xadd(x2, z2, x1, z1, x, z, n)
+            x2, z2 = _xdbl(x2, z2, a24, n)
+        else:
+            x2, z2 = _xadd(x2, z2, x1, z1, x, z, n)
+            x1, z1 = _xdbl(x1, z1, a24, n)
+    return x1, z1
+
+def ecm_curve(n: int, b1: int, b2: int, sigma: int, primes=None):
+    """
+    One ECM curve (Suyama parameter sigma) with stage 1 bound b1 and stage 2 bound b2.
+    Returns:
+        a non-trivial factor of n, or None if this curve did not find one
+    """
+    if primes is None:
+        primes = _small_primes(b2)
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x, z = pow(u, 3, n), pow(v, 3, n)
+    den = 16 * x * v % n
+    g = gcd(den, n)
+    if g != 1:
+        return g if g != n else None
+    a24 = pow(v - u, 3, n) * (3 * u + v) * pow(den, -1, n) % n
+
+    # Stage 1: multiply by the largest power of each prime p <= b1.
+    for p in primes:
+        if p > b1:
+            break
+        pe = p
+        while pe * p <= b1:
+            pe *= p
+        x, z = _ladder(pe, x, z, a24, n)
+    g = gcd(z, n)
+    if g != 1:
+        return g if g != n else None
+
+    # Stage 2: primes q = r + 2d in (b1, b2], giant steps r += 2D, baby steps S_d = 2dQ.
+    D = _ECM_D
+    sx, sz = [0] * (D + 1), [0] * (D + 1)
+    sx[1], sz[1] = _xdbl(x, z, a24, n)
+    sx[2], sz[2] = _xdbl(sx[1], sz[1], a24, n)
+    for d in range(3, D + 1):
+        sx[d], sz[d] = _xadd(sx[d - 1], sz[d - 1], sx[1], sz[1], sx[d - 2], sz[d - 2], n)
+    beta = [sx[d] * sz[d] % n for d in range(D + 1)]
+    r = max((b1 - 1) | 1, 2 * D + 1)
+    rx, rz = _ladder(r, x, z, a24, n)
+    tx, tz = _ladder(r - 2 * D, x, z, a24, n)
+    i = bisect_right(primes, r)
+    acc = 1
+    while r < b2 and i < len(primes):
+        alpha = rx * rz % n
+        top = r + 2 * D
+        while i < len(primes) and primes[i] <= top:
+            d = (primes[i] - r) >> 1
+            acc = acc * ((rx - sx[d]) * (rz + sz[d]) - alpha + beta[d]) % n
+            i += 1
+        rx, rz, tx, tz = (*_xadd(rx, rz, sx[D], sz[D], tx, tz, n), rx, rz)
+        r = top
+    g = gcd(acc, n)
+    return g if 1 < g < n else None
+
+def ecm(n: int, schedule=_ECM_SCHEDULE):
+    """
+    Returns:
+        a non-trivial factor of composite n by Lenstra ECM, raising B1 along `schedule`
+        (the last stage repeats until a factor is found)
+    """
+    for i, (b1, curves) in enumerate(schedule):
+        b2 = 100 * b1
+        primes = _small_primes(b2)
+        c = 0
+        while c < curves or i == len(schedule) - 1:
+            d = ecm_curve(n, b1, b2, random.randrange(6, 1 << 32), primes)
+            if d is not None:
+                return d
+            c += 1
+    return None
+
+def _split(n: int) -> int:
+    """A non-trivial factor of composite n (n >= _SPF_LIMIT)."""
+    if n.bit_length() < _ECM_MIN_BITS:
+        return pollard_rho(n)
+    d = pollard_rho(n, _RHO_BUDGET)
+    return d if d is not None else ecm(n)
+
+def _factor(n: int, out: list):
+    if n == 1:
+        return
+    if n < _SPF_LIMIT:
+        spf = _table().spf
+        while n > 1:
+            p = spf[n]
+            out.append(p)
+            n //= p
+        return
+    if is_prime(n):
+        out.append(n)
+        return
+    d = _split(n)
+    _factor(d, out)
+    _factor(n // d, out)
+
+def factorize(n: int):
+    """
+    Returns:
+        list of the prime factors of n with multiplicity (unsorted); [] for n = 1
+    """
+    res = []
+    _factor(n, res)
+    return res
+
+# --- Batch factorization ---
+
+def _product_tree(xs):
+    """Levels of pairwise products, leaves first; an odd element is carried up unchanged."""
+    tree = [list(xs)]
+    while len(tree[-1]) > 1:
+        prev = tree[-1]
+        level = [prev[i] * prev[i + 1] for i in range(0, len(prev) - 1, 2)]
+        if len(prev) & 1:
+            level.append(prev[-1])
+        tree.append(level)
+    return tree
+
+def _remainder_tree(x: int, tree):
+    """Returns [x % leaf for leaf in tree[0]], reducing x down the product tree."""
+    rems = [x % tree[-1][0]]
+    for level in reversed(tree[:-1]):
+        rems = [rems[i >> 1] % level[i] for i in range(len(level))]
+    return rems
+
+_prime_tree = None
+
+def _small_prime_tree():
+    global _prime_tree
+    if _prime_tree is None:
+        _prime_tree = _product_tree(_small_primes(_TRIAL_LIMIT))
+    return _prime_tree
+
+def _primes_dividing(g: int, tree):
+    """Primes of the tree's leaves dividing the squarefree g: descend with gcds until a part fits the SPF table."""
+    spf = _table().spf
+    limit = len(spf)
+    out = []
+    stack = [(len(tree) - 1, 0, g)]  # leaves are primes < limit, so every branch ends in the table
+    while stack:
+        lvl, i, g = stack.pop()
+        g = gcd(tree[lvl][i] % g, g)  # reduce first: math.gcd is slow on very unbalanced operands
+        if g < limit:
+            while g > 1:
+                out.append(spf[g])
+                g //= spf[g]
+            continue
+        stack.append((lvl - 1, 2 * i, g))
+        if 2 * i + 1 < len(tree[lvl - 1]):
+            stack.append((lvl - 1, 2 * i + 1, g))
+    return out
+
+def _strip_small(values):
+    """
+    Returns:
+        small: {n: [small prime factors with multiplicity]}
+        cofactor: {n: n with every prime <= _TRIAL_LIMIT divided out}
+    """
+    small, cofactor = {}, {}
+    if not values:
+        return small, cofactor
+    ptree = _small_prime_tree()
+    for n, r in zip(values, _remainder_tree(ptree[-1][0], _product_tree(values))):
+        fs = []
+        m = n
+        g = gcd(r, n)
+        if g > 1:
+            for p in _primes_dividing(g, ptree):
+                while m % p == 0:
+                    m //= p
+                    fs.append(p)
+        small[n] = fs
+        cofactor[n] = m
+    return small, cofactor
+
+def _factor_all(values):
+    return [factorize(n) for n in values]
+
+def _submit_batch(chunk, pool, workers: int):
+    distinct = list(dict.fromkeys(n for n in chunk if n > 1))
+    small, cofactor = _strip_small(distinct)
+    easy_limit = _TRIAL_LIMIT * _TRIAL_LIMIT
+    hard = list(dict.fromkeys(c for c in cofactor.values() if c >= easy_limit))
+    if pool is None:
+        done = Future()
+        done.set_result(_factor_all(hard))
+        parts = [(hard, done)]
+    else:
+        step = max(1, -(-len(hard) // (4 * workers)))
+        parts = [(hard[i:i + step], pool.submit(_factor_all, hard[i:i + step])) for i in range(0, len(hard), step)]
+    return chunk, small, cofactor, parts
+
+def _finish_batch(chunk, small, cofactor, parts):
+    done = {}
+    for values, result in parts:
+        done.update(zip(values, result.result()))
+    for n in chunk:
+        if n <= 1:
+            yield []
+            continue
+        c = cofactor[n]
+        rest = [] if c == 1 else done.get(c) or [c]
+        yield sorted(small[n] + rest)
+
+def factorize_many(values, workers: int = 1, batch: int = _BATCH):
+    """
+    Yields the sorted prime factorization (list with multiplicity, [] for n <= 1) of every
+    value, in input order, streaming over any iterable (see "Batch mode" above).
+    workers != 1 factors the hard cofactors on a process pool (None: one per core).
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers) if workers != 1 else None
+    try:
+        it = iter(values)
+        pending = deque()
+        while True:
+            chunk = list(islice(it, batch))
+            if not chunk:
+                break
+            pending.append(_submit_batch(chunk, pool, workers))
+            if len(pending) >= _BATCHES_IN_FLIGHT:
+                yield from _finish_batch(*pending.popleft())
+        while pending:
+            yield from _finish_batch(*pending.popleft())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
@@ -3,6 +3,7 @@
 #but it can also hold for a composite number so we need to be careful 
 #very fast and Carmichael numbers are very rare (only 646 in <= 1e9)
 #Carmichael Numbers ; 561, 1105, 1729, 2465, 2821, 6601, 8911, 10585, 15841, 29341 , ...
+#for a deterministic answer use primality.is_prime (Miller-Rabin below 2^64, Baillie-PSW above)
 
 
 import random
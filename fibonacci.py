@@ -0,0 +1,135 @@
+"""
+Fibonacci engine shared by the number theory scripts.
+
+fib(n, m)           F_n mod m, with n first reduced modulo the Pisano period pi(m)
+fib(n)              exact F_n (big ints), two squarings per bit
+fib_pair(n, m)      (F_n, F_{n+1}) (mod m) by iterative fast doubling over the bits of n, high to low:
+                        F_2k = F_k (2 F_{k+1} - F_k),   F_2k+1 = F_k^2 + F_{k+1}^2
+pisano_period(m)    pi(m), the period of F mod m, cached per modulus
+fib_many(ns, m)     F_n mod m for many n: queries are reduced mod pi(m), sorted and deduplicated,
+                    and each one resumes the doubling from the longest bit prefix it shares with
+                    the previous query (sorted neighbours share the most), so close n cost little
+
+Exact F_n (as in GMP's mpz_fib_ui) works on (F_{k-1}, F_k) and needs only squares, which are
+cheaper than general products of the same size:
+    F_2k-1 = F_k^2 + F_{k-1}^2
+    F_2k+1 = 4 F_k^2 - F_{k-1}^2 + 2 (-1)^k
+    F_2k   = F_2k+1 - F_2k-1
+
+Pisano period: pi(m) = lcm of pi(p^e) over m = prod p^e. pi(2) = 3, pi(5) = 20, and for other
+primes pi(p) divides p - 1 if p = +-1 (mod 5) and 2 (p + 1) if p = +-2 (mod 5); pi(p^e) divides
+p^(e-1) pi(p). The exact period is the order of (F_1, F_2) = (1, 1) under the Fibonacci step:
+starting from the bound N, every prime q of N is divided out while F_{N/q}, F_{N/q+1} = 0, 1
+still holds, so the result does not rely on Wall's conjecture pi(p^e) = p^(e-1) pi(p).
+"""
+from functools import lru_cache
+from math import gcd
+from factorization import factorize
+
+_PISANO_CACHE_SIZE = 1 << 10
+
+def fib_pair(n: int, m=None):
+    """(F_n, F_{n+1}), reduced mod m if given (n >= 0)."""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if bit == "1":
+            c, d = d, c + d
+        if m:
+            c %= m
+            d %= m
+        a, b = c, d
+    return a, b
+
+def _fib_exact(n: int) -> int:
+    if n < 2:
+        return n
+    # (F_{k-1}, F_k) for k = 1, then one doubling step per remaining bit of n.
+    f0, f1 = 0, 1
+    k_odd = True  # parity of k, for (-1)^k
+    for bit in bin(n)[3:]:
+        s0, s1 = f0 * f0, f1 * f1
+        lo = s1 + s0                                          # F_{2k-1}
+        hi = 4 * s1 - s0 + (-2 if k_odd else 2)               # F_{2k+1}
+        mid = hi - lo                                         # F_{2k}
+        if bit == "1":
+            f0, f1, k_odd = mid, hi, True
+        else:
+            f0, f1, k_odd = lo, mid, False
+    return f1
+
+def _counts(n: int):
+    out = {}
+    for p in factorize(n):
+        out[p] = out.get(p, 0) + 1
+    return out
+
+def _order(bound: int, m: int) -> int:
+    """Least N | bound with (F_N, F_{N+1}) == (0, 1) mod m (bound must be a multiple of it)."""
+    for q in _counts(bound):
+        while bound % q == 0 and fib_pair(bound // q, m) == (0, 1 % m):
+            bound //= q
+    return bound
+
+@lru_cache(maxsize=_PISANO_CACHE_SIZE)
+def pisano_period(m: int) -> int:
+    """pi(m): least positive N with F_{n+N} = F_n (mod m) for all n (m >= 1; pi(1) = 1)."""
+    if m == 1:
+        return 1
+    period = 1
+    for p, e in _counts(m).items():
+        if p == 2:
+            base = 3
+        elif p == 5:
+            base = 20
+        elif p % 5 in (1, 4):
+            base = p - 1
+        else:
+            base = 2 * (p + 1)
+        pe = p ** e
+        part = _order(base * p ** (e - 1), pe)
+        period = period // gcd(period, part) * part
+    return period
+
+def fib(n: int, m=None) -> int:
+    """F_n for n >= 0: exact, or mod m (n reduced modulo pisano_period(m) first)."""
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if m is None:
+        return _fib_exact(n)
+    if m == 1:
+        return 0
+    return fib_pair(n % pisano_period(m), m)[0]
+
+def fib_many(ns, m=None):
+    """Returns [fib(n, m) for n in ns]."""
+    ns = list(ns)
+    if m is None:
+        done = {n: _fib_exact(n) for n in set(ns)}
+        return [done[n] for n in ns]
+    if any(n < 0 for n in ns):
+        raise ValueError("n must be non-negative")
+    if m == 1:
+        return [0] * len(ns)
+    period = pisano_period(m)
+    keys = sorted({n % period for n in ns})
+    width = max(keys, default=0).bit_length()
+    # path[j] = (F_k, F_{k+1}) for k = the top j bits of the previous query
+    path = [(0, 1)] * (width + 1)
+    prev = 0
+    done = {}
+    for k in keys:
+        keep = width - (k ^ prev).bit_length()  # bits shared with the previous query
+        del path[keep + 1:]
+        a, b = path[-1]
+        for j in range(keep, width):
+            c = a * (2 * b - a) % m
+            d = (a * a + b * b) % m
+            if k >> (width - 1 - j) & 1:
+                c, d = d, (c + d) % m
+            a, b = c, d
+            path.append((a, b))
+        done[k] = a
+        prev = k
+    return [done[n % period] for n in ns]
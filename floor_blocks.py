@@ -0,0 +1,179 @@
+"""
+Floor-division blocks: the i in [1, n] split into the O(sqrt n) maximal intervals [l, r] on which
+q = floor(n / i) is constant,
+    r = floor(n / q),   next l = r + 1.
+
+floor_blocks(n, lo, hi)         generator of (l, r, q) covering lo <= i <= hi
+floor_blocks2(n, m, lo, hi)     generator of (l, r, qn, qm), both floor(n / i) and floor(m / i)
+                                constant; r = min(n / qn, m / qm), i <= min(n, m) by default
+block_arrays(n)                 (l, r, q) of all blocks as numpy int64 arrays (lists without numpy
+                                or for n >= 2^62)
+block_arrays2(n, m)             the same for two numerators (union of both boundary sets)
+floor_values(n)                 the distinct values floor(n / i), decreasing (= q of block_arrays)
+harmonic_sum(n, f, G)           sum_{i=1}^{n} g(i) f(floor(n / i)) = sum_blocks (G(r) - G(l - 1)) f(q)
+harmonic_sum_many(ns, f, G)     the same for many n with one vectorized evaluation
+harmonic_sum2(n, m, f, G)       sum_{i <= min(n, m)} g(i) f(floor(n / i), floor(m / i))
+triangular(x, mod)              x (x + 1) / 2, the G of g(i) = i, safe on int64 arrays under mod < 2^31
+
+G is the prefix sum of g (G(0) = 0). With numpy, f and G are called once on whole arrays of block
+values, so they must be written with array arithmetic (x * (x + 1) // 2 works on both ints and
+arrays). The arrays have dtype object by default (exact Python ints, no interpreter loop over the
+blocks); dtype=np.int64 is faster when f and G keep their values inside int64, and is then combined
+under a modulus < 2^31 without overflow. Without numpy every block is a Python call.
+
+block_arrays without a loop, k = isqrt(n):
+    i <= k:  the values n // i are pairwise distinct, one block each
+    q <= k:  every such q is attained, and no q in (k, n // k) is, so the remaining values are
+             min(k, n // k - 1), ..., 2, 1
+    r = n // q, l = previous r + 1.
+harmonic_sum_many concatenates the blocks of the distinct n (up to _BATCH_BLOCKS at a time),
+evaluates f and G once per batch and folds each n's run with np.add.reduceat.
+"""
+from math import isqrt
+
+try:
+    import numpy as np
+except ImportError:  # everything runs block by block in Python
+    np = None
+
+INT64 = np.int64 if np is not None else None  # dtype for f and G that stay inside int64
+
+_NUMPY_MOD_MAX = 1 << 31  # products of two residues stay inside int64
+_NUMPY_MAX = 1 << 62  # numerators the int64 block arrays can hold
+_BATCH_BLOCKS = 1 << 20  # harmonic_sum_many evaluates about this many blocks per pass
+
+def floor_blocks(n: int, lo: int = 1, hi=None):
+    """Yields (l, r, q) with floor(n / i) = q for l <= i <= r, covering max(lo, 1) <= i <= hi (default n)."""
+    hi = n if hi is None else min(hi, n)
+    l = max(lo, 1)
+    while l <= hi:
+        q = n // l
+        r = min(n // q, hi)
+        yield l, r, q
+        l = r + 1
+
+def floor_blocks2(n: int, m: int, lo: int = 1, hi=None):
+    """Yields (l, r, qn, qm) with floor(n / i) = qn, floor(m / i) = qm for l <= i <= r, i <= min(n, m) by default."""
+    hi = min(n, m) if hi is None else hi
+    l = max(lo, 1)
+    while l <= hi:
+        qn = n // l if l <= n else 0
+        qm = m // l if l <= m else 0
+        r = hi
+        if qn:
+            r = min(r, n // qn)
+        if qm:
+            r = min(r, m // qm)
+        yield l, r, qn, qm
+        l = r + 1
+
+def floor_values(n: int):
+    """The distinct values floor(n / i), 1 <= i <= n, in decreasing order (numpy array, list without numpy)."""
+    if n < 1:
+        return np.zeros(0, dtype=np.int64) if np is not None else []
+    k = isqrt(n)
+    if np is None or n >= _NUMPY_MAX:
+        return [n // i for i in range(1, k + 1)] + list(range(min(k, n // k - 1), 0, -1))
+    return np.concatenate((n // np.arange(1, k + 1, dtype=np.int64),
+                           np.arange(min(k, n // k - 1), 0, -1, dtype=np.int64)))
+
+def block_arrays(n: int):
+    """(l, r, q) of every block of n as numpy int64 arrays (lists without numpy)."""
+    q = floor_values(n)
+    if isinstance(q, list):
+        r = [n // v for v in q]
+        return [1] + [v + 1 for v in r[:-1]], r, q
+    r = n // q if len(q) else q
+    l = np.empty_like(r)
+    l[:1] = 1
+    l[1:] = r[:-1] + 1
+    return l, r, q
+
+def block_arrays2(n: int, m: int):
+    """(l, r, qn, qm) of every block of (n, m) over 1 <= i <= min(n, m)."""
+    if np is None or max(n, m) >= _NUMPY_MAX:
+        rows = list(floor_blocks2(n, m))
+        return tuple([row[j] for row in rows] for j in range(4))
+    hi = min(n, m)
+    r = np.union1d(block_arrays(n)[1], block_arrays(m)[1])
+    r = r[r < hi]
+    r = np.append(r, hi) if hi >= 1 else r
+    l = np.empty_like(r)
+    l[:1] = 1
+    l[1:] = r[:-1] + 1
+    return l, r, n // l, m // l
+
+def triangular(x, mod=None):
+    """x (x + 1) / 2 (mod `mod`), for ints or int64 arrays; halving first keeps int64 products below mod^2."""
+    if mod is None:
+        return x * (x + 1) // 2
+    if np is not None and isinstance(x, np.ndarray):
+        even = x % 2 == 0
+        return np.where(even, x // 2, x) % mod * (np.where(even, x + 1, (x + 1) // 2) % mod) % mod
+    return x * (x + 1) // 2 % mod
+
+def _block_dtype(dtype, mod, n):
+    """dtype the block arrays are handed to f and G in; None when numpy is not used."""
+    if np is None or n >= _NUMPY_MAX:
+        return None
+    if dtype is None or (mod is not None and mod >= _NUMPY_MOD_MAX):
+        return object
+    return dtype
+
+def _combine(weights, values, mod):
+    if mod is None:
+        return weights * values
+    return (weights % mod) * (values % mod) % mod
+
+def harmonic_sum(n: int, f, G, mod=None, dtype=None) -> int:
+    """sum_{i=1}^{n} g(i) f(floor(n / i)) with G the prefix sum of g (see module docstring)."""
+    if n < 1:
+        return 0
+    dtype = _block_dtype(dtype, mod, n)
+    if dtype is None:
+        total = 0
+        for l, r, q in floor_blocks(n):
+            total += (G(r) - G(l - 1)) * f(q)
+            if mod:
+                total %= mod
+        return total
+    l, r, q = (a.astype(dtype) for a in block_arrays(n))
+    total = _combine(G(r) - G(l - 1), f(q), mod).sum()
+    return int(total % mod if mod else total)
+
+def harmonic_sum_many(ns, f, G, mod=None, dtype=None):
+    """Returns [harmonic_sum(n, f, G, mod) for n in ns] with the blocks of many n evaluated together."""
+    ns = list(ns)
+    distinct = sorted({n for n in ns if n >= 1})
+    dtype = _block_dtype(dtype, mod, distinct[-1] if distinct else 0)
+    if dtype is None:
+        done = {n: harmonic_sum(n, f, G, mod) for n in distinct}
+        return [done.get(n, 0) for n in ns]
+    done = {}
+    pending, size = [], 0
+    for i, n in enumerate(distinct):
+        pending.append((n, block_arrays(n)))
+        size += len(pending[-1][1][0])
+        if size >= _BATCH_BLOCKS or i == len(distinct) - 1:
+            starts = np.cumsum([0] + [len(b[0]) for _, b in pending[:-1]])
+            l, r, q = (np.concatenate([b[j] for _, b in pending]).astype(dtype) for j in range(3))
+            sums = np.add.reduceat(_combine(G(r) - G(l - 1), f(q), mod), starts)
+            done.update((m, int(s % mod if mod else s)) for (m, _), s in zip(pending, sums))
+            pending, size = [], 0
+    return [done.get(n, 0) for n in ns]
+
+def harmonic_sum2(n: int, m: int, f, G, mod=None, dtype=None) -> int:
+    """sum_{i=1}^{min(n, m)} g(i) f(floor(n / i), floor(m / i)) with G the prefix sum of g."""
+    if min(n, m) < 1:
+        return 0
+    dtype = _block_dtype(dtype, mod, max(n, m))
+    if dtype is None:
+        total = 0
+        for l, r, qn, qm in floor_blocks2(n, m):
+            total += (G(r) - G(l - 1)) * f(qn, qm)
+            if mod:
+                total %= mod
+        return total
+    l, r, qn, qm = (a.astype(dtype) for a in block_arrays2(n, m))
+    total = _combine(G(r) - G(l - 1), f(qn, qm), mod).sum()
+    return int(total % mod if mod else total)
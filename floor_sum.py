@@ -0,0 +1,238 @@
+"""
+Floor sums in O(log) by the Euclidean-like recursion.
+
+floor_sum(n, m, a, b)       sum_{i=0}^{n-1} floor((a i + b) / m)
+                            = number of lattice points (i, y) with 0 <= i < n, 0 < y <= (a i + b) / m
+                            (for a i + b >= 0), i.e. the points under a line
+floor_power_sums(n, m, a, b, p, q)
+                            S[s][t] = sum_{i=0}^{n-1} i^s floor((a i + b) / m)^t for s <= p, t <= q
+                            (the weighted sums by i and i^2, the sum of floor^2, ...)
+count_under_line(a, b, c)   #{(x, y) >= 0 : a x + b y <= c}, the lattice points of a triangle
+count_lattice_polygon(hs)   #{(t, k) integers : p t + q k <= r for every (p, q, r) in hs}, any
+                            bounded convex polygon given by half-planes with integer coefficients
+
+Arbitrary-precision ints throughout, any sign of a and b, m > 0; both loops are iterative, so huge
+inputs do not hit the recursion limit.
+
+floor_sum (the loop of the AtCoder Library): a = qa m + a', b = qb m + b' split off
+    qa n (n - 1) / 2 + qb n,
+after which 0 <= a, b < m. With y_max = a n + b, the points under the line counted by columns are
+the same points counted by rows of the transposed problem
+    (n, m, a, b) -> (y_max / m, a, m, y_max mod m),
+and (m, a) shrink like the Euclidean algorithm: O(log m) steps.
+
+floor_power_sums: the universal Euclidean algorithm. Walking x = 1..L along y = floor((P x + R) / Q)
+writes a word of U (y += 1) and R (x += 1, then add x^s y^t to every S[s][t]). A word is reduced
+to a monoid element (dx, dy, S); concatenation shifts the right part by the left part's (dx, dy),
+    S[s][t] = S1[s][t] + sum_{s' <= s, t' <= t} C(s, s') C(t, t') dx1^(s-s') dy1^(t-t') S2[s'][t'].
+The word for (P, Q, R, L) is built from the word for the transposed line (Q, P, (Q - R - 1) mod P,
+m - 1) with U and R swapped, plus powers of single letters, so O(log max(P, Q)) steps each costing
+a few monoid powers. The sums for i = x - 1 and general a, b follow by expanding the polynomials.
+
+count_lattice_polygon: half-planes with q > 0 bound k from above, q < 0 from below. The range of
+t is the projection of the polygon (every lower bound <= every upper bound, plus the q = 0
+constraints), and it is cut where two upper (or two lower) bounds cross, so that on each piece
+one upper U and one lower L are active; the column of t holds floor(U(t)) - ceil(L(t)) + 1
+points, two floor_sums per piece. O(h^2 log) for h half-planes, independent of the area.
+"""
+from fractions import Fraction
+from math import comb
+
+def floor_sum(n: int, m: int, a: int, b: int) -> int:
+    """sum_{i=0}^{n-1} floor((a i + b) / m) for n >= 0, m >= 1 (any a, b)."""
+    if m < 1:
+        raise ValueError("m must be positive")
+    ans = 0
+    if a < 0:
+        ans += n * (n - 1) // 2 * (a // m)
+        a %= m
+    if b < 0:
+        ans += n * (b // m)
+        b %= m
+    while True:
+        if a >= m:
+            ans += n * (n - 1) // 2 * (a // m)
+            a %= m
+        if b >= m:
+            ans += n * (b // m)
+            b %= m
+        y_max = a * n + b
+        if y_max < m:
+            return ans
+        n, b = divmod(y_max, m)
+        m, a = a, m
+
+# --- Universal Euclidean algorithm over (dx, dy, S) monoid elements ---
+
+def _identity(p: int, q: int):
+    return 0, 0, [[0] * (q + 1) for _ in range(p + 1)]
+
+def _concat(u, v):
+    dx1, dy1, s1 = u
+    dx2, dy2, s2 = v
+    p, q = len(s1) - 1, len(s1[0]) - 1
+    px = [1] * (p + 1)
+    for k in range(1, p + 1):
+        px[k] = px[k - 1] * dx1
+    py = [1] * (q + 1)
+    for k in range(1, q + 1):
+        py[k] = py[k - 1] * dy1
+    out = [row[:] for row in s1]
+    for s in range(p + 1):
+        for t in range(q + 1):
+            total = 0
+            for s2_ in range(s + 1):
+                cs = comb(s, s2_) * px[s - s2_]
+                row = s2[s2_]
+                for t2 in range(t + 1):
+                    if row[t2]:
+                        total += cs * comb(t, t2) * py[t - t2] * row[t2]
+            out[s][t] += total
+    return dx1 + dx2, dy1 + dy2, out
+
+def _power(u, e: int):
+    p, q = len(u[2]) - 1, len(u[2][0]) - 1
+    res = _identity(p, q)
+    while e:
+        if e & 1:
+            res = _concat(res, u)
+        e >>= 1
+        if e:
+            u = _concat(u, u)
+    return res
+
+def _universal_euclid(P: int, Q: int, R: int, L: int, up, right):
+    """Monoid element of the word for y = floor((P x + R) / Q), x = 1..L (P >= 0, 0 <= R < Q)."""
+    p, q = len(up[2]) - 1, len(up[2][0]) - 1
+    left = _identity(p, q)
+    rights = []
+    while True:
+        if L == 0:
+            core = _identity(p, q)
+            break
+        if P >= Q:
+            right = _concat(_power(up, P // Q), right)
+            P %= Q
+        m = (L * P + R) // Q
+        if m == 0:
+            core = _power(right, L)
+            break
+        cnt = L - (Q * m - R - 1) // P
+        left = _concat(left, _concat(_power(right, (Q - R - 1) // P), up))
+        rights.append(_power(right, cnt))
+        P, Q, R, L, up, right = Q, P, (Q - R - 1) % P, m - 1, right, up
+    res = _concat(left, core)
+    for r in reversed(rights):
+        res = _concat(res, r)
+    return res
+
+def _poly_mul(f, g):
+    out = [0] * (len(f) + len(g) - 1)
+    for i, x in enumerate(f):
+        if x:
+            for j, y in enumerate(g):
+                out[i + j] += x * y
+    return out
+
+def _poly_pow(f, e: int):
+    out = [1]
+    for _ in range(e):
+        out = _poly_mul(out, f)
+    return out
+
+def floor_power_sums(n: int, m: int, a: int, b: int, p: int = 1, q: int = 2):
+    """
+    Returns:
+        S with S[s][t] = sum_{i=0}^{n-1} i^s floor((a i + b) / m)^t for 0 <= s <= p, 0 <= t <= q
+        (n >= 0, m >= 1, any a, b; 0^0 = 1)
+    """
+    if m < 1:
+        raise ValueError("m must be positive")
+    if n <= 0:
+        return [[0] * (q + 1) for _ in range(p + 1)]
+    # x = i + 1 in 1..n:  floor((a i + b) / m) = z(x) + qa x + qb,  z(x) = floor((a' x + r) / m)
+    qa, a1 = divmod(a, m)
+    qb, r = divmod(b - a, m)
+    P, Qd = p + q, q
+    up = (0, 1, [[0] * (Qd + 1) for _ in range(P + 1)])
+    right = (1, 0, [[1 if t == 0 else 0 for t in range(Qd + 1)] for _ in range(P + 1)])
+    T = _universal_euclid(a1, m, r, n, up, right)[2]  # T[k][j] = sum_x x^k z^j
+    out = [[0] * (q + 1) for _ in range(p + 1)]
+    for s in range(p + 1):
+        xs = _poly_pow([-1, 1], s)  # (x - 1)^s
+        for t in range(q + 1):
+            total = 0
+            for j in range(t + 1):
+                poly = _poly_mul(xs, _poly_pow([qb, qa], t - j))  # (x-1)^s (qa x + qb)^(t-j)
+                c = comb(t, j)
+                total += c * sum(coef * T[k][j] for k, coef in enumerate(poly) if coef)
+            out[s][t] = total
+    return out
+
+def count_under_line(a: int, b: int, c: int) -> int:
+    """#{(x, y) integers >= 0 : a x + b y <= c} for a, b >= 1."""
+    if c < 0:
+        return 0
+    n = c // a + 1
+    # sum over x of (floor((c - a x) / b) + 1)
+    return floor_sum(n, b, -a, c) + n
+
+def count_lattice_polygon(constraints) -> int:
+    """
+    Number of integer points (t, k) with p t + q k <= r for every (p, q, r) in constraints.
+    Raises ValueError if the region is unbounded (and not empty).
+    """
+    uppers, lowers = [], []
+    t_lo, t_hi = None, None
+    bounds = []  # coef t <= rhs
+    for p, q, r in constraints:
+        if q > 0:
+            uppers.append((p, q, r))
+        elif q < 0:
+            lowers.append((p, q, r))
+        else:
+            bounds.append((p, r))
+    # the projection on t: lower(t) <= upper(t) for every pair
+    for pl, ql, rl in lowers:
+        for pu, qu, ru in uppers:
+            bounds.append((pl * qu - pu * ql, -ru * ql + rl * qu))
+    for coef, rhs in bounds:
+        if coef > 0:
+            bound = rhs // coef
+            t_hi = bound if t_hi is None else min(t_hi, bound)
+        elif coef < 0:
+            bound = -(rhs // -coef)  # ceil(rhs / coef)
+            t_lo = bound if t_lo is None else max(t_lo, bound)
+        elif rhs < 0:
+            return 0
+    if t_lo is not None and t_hi is not None and t_lo > t_hi:
+        return 0
+    if t_lo is None or t_hi is None or not uppers or not lowers:
+        raise ValueError("unbounded region")
+
+    def value(h, t):
+        p, q, r = h
+        return Fraction(r - p * t, q)  # the bound on k at t
+
+    cuts = set()
+    for group in (uppers, lowers):
+        for i, (p1, q1, r1) in enumerate(group):
+            for p2, q2, r2 in group[i + 1:]:
+                den = p2 * q1 - p1 * q2
+                if den:
+                    cut = (r2 * q1 - r1 * q2) // den  # the bounds cross in [cut, cut + 1)
+                    if t_lo <= cut < t_hi:
+                        cuts.add(cut)
+    total = 0
+    lo = t_lo
+    for hi in sorted(cuts) + [t_hi]:
+        upper = min(uppers, key=lambda h: (value(h, lo), value(h, hi)))
+        lower = max(lowers, key=lambda h: (value(h, lo), value(h, hi)))
+        pu, qu, ru = upper
+        pl, ql, rl = lower
+        n = hi - lo + 1
+        # floor((ru - pu t) / qu) - ceil((rl - pl t) / ql) + 1 for t = lo + i, i < n, where
+        # -ceil((rl - pl t) / ql) = floor((rl - pl t) / -ql)
+        total += floor_sum(n, qu, -pu, ru - pu * lo) + floor_sum(n, -ql, -pl, rl - pl * lo) + n
+        lo = hi + 1
+    return total
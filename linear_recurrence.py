@@ -0,0 +1,207 @@
+"""
+Linear recurrences mod p: a_n = c_1 a_{n-1} + c_2 a_{n-2} + ... + c_k a_{n-k}.
+
+berlekamp_massey(seq, p)        shortest (c_1..c_k) generating seq (prime p), O(len^2)
+nth_term(c, a, n, p)            a_n by Bostan-Mori, O(M(k) log n)
+nth_terms(c, a, ns, p)          a_n for many n (Kitamasa with shared doubling prefixes)
+poly_mul(f, g, p)               product of two coefficient lists mod p
+
+Polynomial products: mod 998244353 = 119 * 2^23 + 1 (the modulus of Phi Feild.py) with numpy, a
+number-theoretic transform: iterative radix-2 butterflies, one vectorized pass per level (all
+products of residues < 2^30 stay inside int64). For any other p, or without numpy, Kronecker
+substitution: both polynomials are packed into one big int each (slots wide enough for the
+largest coefficient of the product), multiplied by CPython's Karatsuba and unpacked.
+
+Bostan-Mori: with Q(x) = 1 - c_1 x - ... - c_k x^k and P = (a_0 + ... + a_{k-1} x^{k-1}) Q mod x^k,
+a_n = [x^n] P / Q. Since Q(x) Q(-x) is even,
+    [x^n] P(x) / Q(x) = [x^n] P(x) Q(-x) / V(x^2),   V(x^2) = Q(x) Q(-x),
+keep the coefficients of P(x) Q(-x) of parity n, halve n and repeat: log n rounds of two
+products of size k.
+
+Kitamasa: a_n = sum_i r_i a_i with r(x) = x^n mod (x^k - c_1 x^{k-1} - ... - c_k). x^n is built
+over the bits of n (square, times x) with the remainder taken through a precomputed inverse of
+the reversed modulus (two products per reduction). nth_terms sorts the queries and resumes each
+from the longest bit prefix it shares with the previous one, so the powers of x are shared.
+"""
+try:
+    import numpy as np
+except ImportError:  # Kronecker substitution for every product
+    np = None
+
+NTT_MOD = 998244353
+_NTT_ROOT = 3
+_NTT_MIN = 64  # below this many coefficients Kronecker substitution is faster
+
+_ntt_tables = {}  # size -> (bit-reversal permutation, twiddles with w_h^j at h + j)
+
+def _ntt_table(size: int):
+    table = _ntt_tables.get(size)
+    if table is None:
+        bits = size.bit_length() - 1
+        idx = np.arange(size)
+        rev = np.zeros(size, dtype=np.int64)
+        for b in range(bits):
+            rev |= ((idx >> b) & 1) << (bits - 1 - b)
+        roots = np.ones(size, dtype=np.int64)
+        h = 1
+        while h < size:
+            w = pow(_NTT_ROOT, (NTT_MOD - 1) // (2 * h), NTT_MOD)
+            if h == 1:
+                roots[1] = 1
+            else:
+                # w_h^(2j) = w_{h/2}^j, w_h^(2j+1) = w_{h/2}^j w_h
+                roots[h:2 * h:2] = roots[h // 2:h]
+                roots[h + 1:2 * h:2] = roots[h // 2:h] * w % NTT_MOD
+            h *= 2
+        table = _ntt_tables[size] = (rev, roots)
+    return table
+
+def _ntt(a, invert: bool = False):
+    size = len(a)
+    rev, roots = _ntt_table(size)
+    a = a[rev]
+    h = 1
+    while h < size:
+        a = a.reshape(-1, 2 * h)
+        u = a[:, :h]
+        v = a[:, h:] * roots[h:2 * h] % NTT_MOD
+        a = np.concatenate(((u + v) % NTT_MOD, (u - v) % NTT_MOD), axis=1)
+        h *= 2
+    a = a.reshape(-1)
+    if invert:
+        a = np.concatenate((a[:1], a[:0:-1])) * pow(size, NTT_MOD - 2, NTT_MOD) % NTT_MOD
+    return a
+
+def _ntt_mul(f, g):
+    n = len(f) + len(g) - 1
+    size = 1 << (n - 1).bit_length()
+    fa = np.zeros(size, dtype=np.int64)
+    fa[:len(f)] = f
+    ga = np.zeros(size, dtype=np.int64)
+    ga[:len(g)] = g
+    return _ntt(_ntt(fa) * _ntt(ga) % NTT_MOD, True)[:n].tolist()
+
+def _kronecker_mul(f, g, p: int):
+    width = (2 * (p - 1).bit_length() + min(len(f), len(g)).bit_length() + 7) // 8
+    x = int.from_bytes(b"".join(v.to_bytes(width, "little") for v in f), "little")
+    y = int.from_bytes(b"".join(v.to_bytes(width, "little") for v in g), "little")
+    n = len(f) + len(g) - 1
+    raw = (x * y).to_bytes(n * width, "little")
+    return [int.from_bytes(raw[i:i + width], "little") % p for i in range(0, n * width, width)]
+
+def poly_mul(f, g, p: int = NTT_MOD):
+    """Coefficients of f * g mod p (lists of residues in [0, p), lowest degree first)."""
+    if not f or not g:
+        return []
+    if np is not None and p == NTT_MOD and min(len(f), len(g)) >= _NTT_MIN:
+        return _ntt_mul(f, g)
+    return _kronecker_mul(f, g, p)
+
+def berlekamp_massey(seq, p: int = NTT_MOD):
+    """
+    Returns:
+        [c_1, ..., c_k], the shortest recurrence with seq[n] = sum c_i seq[n - i] (mod prime p)
+    """
+    s = [v % p for v in seq]
+    C, B = [1], [1]  # connection polynomials (C[0] = 1)
+    L, m, b = 0, 1, 1
+    for n in range(len(s)):
+        d = s[n]
+        for i in range(1, L + 1):
+            d += C[i] * s[n - i]
+        d %= p
+        if d == 0:
+            m += 1
+            continue
+        coef = d * pow(b, p - 2, p) % p
+        T = C[:]
+        if len(C) < len(B) + m:
+            C += [0] * (len(B) + m - len(C))
+        for i, v in enumerate(B):
+            C[i + m] = (C[i + m] - coef * v) % p
+        if 2 * L <= n:
+            L, B, b, m = n + 1 - L, T, d, 1
+        else:
+            m += 1
+    return [-v % p for v in C[1:L + 1]]
+
+def _check(coeffs, initial, p):
+    k = len(coeffs)
+    if len(initial) < k:
+        raise ValueError("need at least len(coeffs) initial terms")
+    return [c % p for c in coeffs], [a % p for a in initial]
+
+def nth_term(coeffs, initial, n: int, p: int = NTT_MOD) -> int:
+    """a_n of the recurrence a_n = sum coeffs[i-1] a_{n-i} with a_0.. = initial (Bostan-Mori)."""
+    coeffs, initial = _check(coeffs, initial, p)
+    if n < len(initial):
+        return initial[n]
+    k = len(coeffs)
+    if k == 0:
+        return 0
+    Q = [1] + [-c % p for c in coeffs]
+    P = poly_mul(initial[:k], Q, p)[:k]
+    while n:
+        Qm = [v if i % 2 == 0 else -v % p for i, v in enumerate(Q)]
+        U = poly_mul(P, Qm, p)
+        P = U[n & 1::2]
+        Q = poly_mul(Q, Qm, p)[::2]
+        n >>= 1
+    return P[0] * pow(Q[0], p - 2, p) % p if P else 0
+
+def _poly_inverse(f, n: int, p: int):
+    """g with f g = 1 mod x^n (f[0] != 0), by Newton's iteration."""
+    g = [pow(f[0], p - 2, p)]
+    size = 1
+    while size < n:
+        size *= 2
+        fg = poly_mul(f[:size], g, p)[:size]
+        fg = [-v % p for v in fg]
+        fg[0] = (fg[0] + 2) % p
+        g = poly_mul(g, fg, p)[:size]
+    return g[:n]
+
+def nth_terms(coeffs, initial, ns, p: int = NTT_MOD):
+    """Returns [a_n for n in ns] for one recurrence (see nth_term); x^n mod the characteristic
+    polynomial is shared between queries with a common bit prefix."""
+    coeffs, initial = _check(coeffs, initial, p)
+    ns = list(ns)
+    k = len(coeffs)
+    done = {n: initial[n] for n in ns if n < len(initial)}
+    big = sorted({n for n in ns if n not in done})
+    if not big or k == 0:
+        return [done.get(n, 0) for n in ns]
+    # Characteristic polynomial C(x) = x^k - c_1 x^(k-1) - ... - c_k, stored lowest degree first.
+    C = [-c % p for c in reversed(coeffs)] + [1]
+    rev_inv = _poly_inverse(C[::-1], k, p)  # (x^k C(1/x))^-1 mod x^k
+
+    def reduce(A):
+        """A mod C for deg A <= 2k - 2."""
+        if len(A) <= k:
+            return A + [0] * (k - len(A))
+        m = len(A) - k  # quotient has m coefficients
+        q = poly_mul(A[::-1][:m], rev_inv[:m], p)[:m][::-1]
+        qc = poly_mul(q, C, p)
+        return [(A[i] - qc[i]) % p for i in range(k)]
+
+    def times_x(r):
+        # x r(x) mod C: shift up, replace x^k by c_1 x^(k-1) + ... + c_k
+        top = r[-1]
+        out = [0] + r[:-1]
+        return [(v - top * C[i]) % p for i, v in enumerate(out)]
+
+    width = big[-1].bit_length()
+    path = [[1] + [0] * (k - 1)] * (width + 1)  # path[j] = x^(top j bits of prev) mod C
+    prev = 0
+    for n in big:
+        keep = width - (n ^ prev).bit_length()
+        del path[keep + 1:]
+        r = path[-1]
+        for j in range(keep, width):
+            r = reduce(poly_mul(r, r, p))
+            if n >> (width - 1 - j) & 1:
+                r = times_x(r)
+            path.append(r)
+        done[n] = sum(ri * ai for ri, ai in zip(r, initial)) % p
+        prev = n
+    return [done[n] for n in ns]
@@ -0,0 +1,164 @@
+"""
+Möbius function engine: mu sieve, single values, Mertens function, Möbius inversion.
+
+mobius(n)               one factorization (factorization.py) per distinct n, memoized in an LRU
+mu_range(limit)         mu(0..limit) as an int8 array('b') (mu(0) = 0)
+mertens(x)              M(x) = sum_{n <= x} mu(n) in about O(x^(2/3))
+mobius_inversion(g)     f with g(n) = sum_{d | n} f(d), for a whole table g[1..n]
+
+mu_range: without numpy, the linear sieve over the shared SPF table:
+    p = spf(n), m = n / p:   mu(n) = 0 if p | m else -mu(m).
+With numpy, one vectorized pass per prime p <= sqrt(limit): flip the sign of the multiples of p,
+zero the multiples of p^2 and multiply p into a running product; where the product falls short
+of n, the one remaining prime factor (> sqrt(limit)) flips the sign once more.
+
+mertens: from sum_{d <= x} M(x/d) = 1,
+    M(v) = 1 - sum_{d=2}^{v} M(v/d)
+         = 1 - sum_{d=2}^{s} M(v/d) - sum_{q=1}^{v/(s+1)} (v/q - v/(q+1)) M(q),     s = isqrt(v)
+M is tabulated up to u ~ x^(2/3) (prefix sums of mu_range). The only values above u that the
+recursion reaches are v = x/k for k < x/u; they are computed for k from large to small and
+stored by k (the memo is keyed by the distinct values floor(x/k)), so M(v/d) = big[k*d].
+Time O(u + x/sqrt(u)) = O(x^(2/3)); numpy vectorizes both inner sums.
+
+mobius_inversion: Dirichlet division by the constant-1 function one prime at a time,
+    for each prime p, for i = n/p down to 1:  g[i p] -= g[i]
+O(n log log n) (within the O(n log n) of the direct sum over mu(d)); numpy does each prime as one
+slice update, which reads the pre-update values exactly like the descending loop.
+Nothing is computed at import.
+"""
+from array import array
+from functools import lru_cache
+from math import isqrt
+from factorization import factorize
+from prime_tables import get_table
+from seive import iter_primes
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python loops are used instead
+    np = None
+
+_MU_CACHE_SIZE = 1 << 16
+_MERTENS_MIN_TABLE = 1 << 16
+_MERTENS_MAX_TABLE = 1 << 26  # cap on the tabulated prefix (int32, 256 MiB); ~x^(2/3) up to x ~ 5e11
+_SEGMENT = 1 << 20
+
+@lru_cache(maxsize=_MU_CACHE_SIZE)
+def mobius(n: int) -> int:
+    """mu(n) for n >= 1 (backed by the shared factorizer)."""
+    if n < 1:
+        raise ValueError("n must be positive")
+    factors = factorize(n)
+    if len(set(factors)) != len(factors):
+        return 0
+    return -1 if len(factors) & 1 else 1
+
+def _mu_numpy_segments(limit: int):
+    """Yields (lo, mu[lo:lo + len]) as int8 arrays covering 0..limit."""
+    primes = list(iter_primes(2, isqrt(limit)))
+    for lo in range(0, limit + 1, _SEGMENT):
+        hi = min(lo + _SEGMENT, limit + 1)
+        mu = np.ones(hi - lo, dtype=np.int8)
+        prod = np.ones(hi - lo, dtype=np.int64)
+        for p in primes:
+            start = -lo % p
+            mu[start::p] *= -1
+            prod[start::p] *= p
+            pp = p * p
+            mu[-lo % pp::pp] = 0
+        mu[prod != np.arange(lo, hi, dtype=np.int64)] *= -1
+        if lo == 0:
+            mu[0] = 0
+        yield lo, mu
+
+def mu_range(limit: int):
+    """
+    Returns:
+        array('b') with mu[n] = mu(n) for 0 <= n <= limit
+    """
+    if limit < 1:
+        return array("b", [0]) * (limit + 1)
+    if np is not None:
+        out = array("b")
+        for _, mu in _mu_numpy_segments(limit):
+            out.frombytes(mu.tobytes())
+        return out
+    spf = get_table(limit).spf
+    mu = array("b", [0]) * (limit + 1)
+    mu[1] = 1
+    for n in range(2, limit + 1):
+        p = spf[n]
+        m = n // p
+        mu[n] = 0 if spf[m] == p else -mu[m]
+    return mu
+
+_prefix = None  # M(0..len-1): numpy int32 array or list, grown on demand
+
+def _mertens_prefix(u: int):
+    global _prefix
+    if _prefix is None or len(_prefix) <= u:
+        size = max(u, _MERTENS_MIN_TABLE, 0 if _prefix is None else 2 * (len(_prefix) - 1))
+        if np is not None:
+            _prefix = np.empty(size + 1, dtype=np.int32)
+            carry = 0
+            for lo, mu in _mu_numpy_segments(size):
+                np.cumsum(mu, dtype=np.int32, out=_prefix[lo:lo + len(mu)])
+                _prefix[lo:lo + len(mu)] += carry
+                carry = int(_prefix[lo + len(mu) - 1])
+        else:
+            total = 0
+            _prefix = []
+            for m in mu_range(size):
+                total += m
+                _prefix.append(total)
+    return _prefix
+
+def mertens(x: int) -> int:
+    """M(x) = sum_{n <= x} mu(n) (0 for x < 1)."""
+    if x < 1:
+        return 0
+    u = min(max(int(round(x ** (2 / 3))), _MERTENS_MIN_TABLE), _MERTENS_MAX_TABLE, x)
+    pre = _mertens_prefix(u)
+    if x < len(pre):
+        return int(pre[x])
+    u = len(pre) - 1
+    K = x // (u + 1)  # v = x // k > u exactly for k <= K
+    big = np.zeros(K + 1, dtype=np.int64) if np is not None else [0] * (K + 1)
+    for k in range(K, 0, -1):
+        v = x // k
+        s = isqrt(v)
+        top = v // (s + 1)
+        if np is not None:
+            d = np.arange(2, s + 1, dtype=np.int64)
+            kd = k * d
+            inside = kd <= K
+            total = int(big[kd[inside]].sum())
+            total += int(pre[v // d[~inside]].sum(dtype=np.int64))
+            q = np.arange(1, top + 1, dtype=np.int64)
+            total += int(((v // q - v // (q + 1)) * pre[q]).sum())
+        else:
+            total = 0
+            for d in range(2, s + 1):
+                kd = k * d
+                total += big[kd] if kd <= K else pre[v // d]
+            for q in range(1, top + 1):
+                total += (v // q - v // (q + 1)) * pre[q]
+        big[k] = 1 - total
+    return int(big[1])
+
+def mobius_inversion(g):
+    """
+    Returns f with g(n) = sum_{d | n} f(d) for 1 <= n < len(g) (index 0 is passed through).
+    A numpy array in gives a numpy array out; anything else gives a list.
+    """
+    n = len(g) - 1
+    if np is not None and isinstance(g, np.ndarray):
+        f = g.copy()
+        for p in iter_primes(2, n):
+            f[p::p] -= f[1:n // p + 1]
+        return f
+    f = list(g)
+    for p in iter_primes(2, n):
+        for i in range(n // p, 0, -1):
+            f[i * p] -= f[i]
+    return f
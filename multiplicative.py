@@ -0,0 +1,289 @@
+"""
+Multiplicative functions from their values on prime powers.
+
+A multiplicative f (f(1) = 1, f(ab) = f(a) f(b) for coprime a, b) is described by
+    prime_power(p, e) -> f(p^e)
+    prime_poly         coefficients (c_0, c_1, ...) with f(p) = sum_k c_k p^k (used by prefix_sum)
+Presets: SIGMA0 (number of divisors), SIGMA1 (sum of divisors), PHI, MU, ONE, ID.
+
+evaluate(f, n)              f(n) from one factorization (factorization.py)
+table(f, n)                 f(0..n) by the linear sieve over the shared SPF table: with p = spf(i)
+                            and q = p^e the exact power of p in i,
+                                f(i) = f(p, e)                 if i == q
+                                f(i) = f(q) * f(i / q)         otherwise          O(n)
+dirichlet_convolve(a, b)    (a * b)(n) = sum_{d | n} a(d) b(n / d) over tables, O(n log n)
+prefix_sum(f, n)            sum_{i <= n} f(i) by min_25, O(n^(3/4) / log n)
+du_sieve(n, ...)            sum_{i <= n} f(i) by Du's sieve, O(n^(2/3)) when f * g = h has easy g, h
+
+min_25 works on the O(sqrt n) distinct values w = floor(n / i), indexed by w for w <= sqrt(n) and
+by n / w otherwise.
+    Phase 1 (prime sums): g_k(w) starts as sum_{2 <= x <= w} x^k; for each prime p <= sqrt(n), every
+        w >= p^2 drops the x whose least prime factor is p:
+            g_k(w) -= p^k (g_k(w / p) - g_k(p - 1))
+        leaving g_k(w) = sum_{primes q <= w} q^k, and G(w) = sum_k c_k g_k(w) = sum_{q <= w} f(q).
+    Phase 2 (all x): F(w) starts as G(w); for each prime p <= sqrt(n) in decreasing order, every
+        w >= p^2 adds the x with least prime factor p:
+            F(w) += sum_{e >= 1, p^(e+1) <= w} f(p^e) (F(w / p^e) - G(p)) + f(p^(e+1))
+        F(w) - G(p) is the sum over x <= w whose least prime factor exceeds p.
+    Within one prime both updates only read smaller w, so every w can be updated at once (one
+    vectorized step per prime with numpy when a modulus < 2^31 keeps products inside int64).
+
+Du's sieve: if g(1) = 1 and h = f * g, then with S = prefix sums of f,
+    S(n) = H(n) - sum_{d=2}^{n} g(d) S(n / d)
+S is tabulated up to ~n^(2/3); above that the memo dict is keyed by the distinct values n / d.
+"""
+from array import array
+from bisect import bisect_right
+from math import isqrt
+from factorization import factorize
+from floor_blocks import floor_blocks, floor_values
+from prime_tables import get_table
+
+try:
+    import numpy as np
+except ImportError:  # prefix_sum runs on Python ints only
+    np = None
+
+_NUMPY_MOD_MAX = 1 << 31  # products of two residues stay inside int64
+
+class Multiplicative:
+    __slots__ = ("name", "prime_power", "prime_poly")
+
+    def __init__(self, name: str, prime_power, prime_poly=None):
+        self.name = name
+        self.prime_power = prime_power
+        self.prime_poly = tuple(prime_poly) if prime_poly is not None else None
+
+    def __repr__(self):
+        return "Multiplicative(%r)" % self.name
+
+SIGMA0 = Multiplicative("sigma0", lambda p, e: e + 1, (2,))
+SIGMA1 = Multiplicative("sigma1", lambda p, e: (p ** (e + 1) - 1) // (p - 1), (1, 1))
+PHI = Multiplicative("phi", lambda p, e: p ** (e - 1) * (p - 1), (-1, 1))
+MU = Multiplicative("mu", lambda p, e: -1 if e == 1 else 0, (-1,))
+ONE = Multiplicative("one", lambda p, e: 1, (1,))
+ID = Multiplicative("id", lambda p, e: p ** e, (0, 1))
+
+PRESETS = {f.name: f for f in (SIGMA0, SIGMA1, PHI, MU, ONE, ID)}
+
+def evaluate(f: Multiplicative, n: int, mod=None) -> int:
+    """f(n) for n >= 1 from the factorization of n."""
+    counts = {}
+    for p in factorize(n):
+        counts[p] = counts.get(p, 0) + 1
+    res = 1
+    for p, e in counts.items():
+        res *= f.prime_power(p, e)
+        if mod:
+            res %= mod
+    return res % mod if mod else res
+
+def table(f: Multiplicative, n: int, mod=None):
+    """
+    Returns:
+        list vals with vals[i] = f(i) for 0 <= i <= n (vals[0] = 0), reduced mod `mod` if given
+    """
+    vals = [0] * (n + 1)
+    if n < 1:
+        return vals
+    spf = get_table(n).spf
+    pe = array("Q", [0]) * (n + 1)  # exact power of spf(i) dividing i
+    ex = bytearray(n + 1)
+    vals[1] = 1 % mod if mod else 1
+    prime_power = f.prime_power
+    for i in range(2, n + 1):
+        p = spf[i]
+        j = i // p
+        if j % p:
+            q = pe[i] = p
+            e = ex[i] = 1
+        else:
+            q = pe[i] = pe[j] * p
+            e = ex[i] = ex[j] + 1
+        v = prime_power(p, e) if q == i else vals[q] * vals[i // q]
+        vals[i] = v % mod if mod else v
+    return vals
+
+def dirichlet_convolve(a, b, mod=None):
+    """
+    Returns c with c[n] = sum_{d | n} a[d] b[n / d] for 1 <= n < min(len(a), len(b)) (c[0] = 0).
+    numpy int64 arrays in give a numpy array out (the caller keeps the values inside int64).
+    """
+    n = min(len(a), len(b)) - 1
+    if np is not None and isinstance(a, np.ndarray) and isinstance(b, np.ndarray):
+        c = np.zeros(n + 1, dtype=np.int64)
+        for d in range(1, n + 1):
+            if a[d]:
+                c[d::d] += a[d] * b[1:n // d + 1]
+                if mod:
+                    c[d::d] %= mod
+        return c
+    c = [0] * (n + 1)
+    for d in range(1, n + 1):
+        ad = a[d]
+        if not ad:
+            continue
+        for k in range(1, n // d + 1):
+            c[d * k] += ad * b[k]
+    if mod:
+        c = [v % mod for v in c]
+    return c
+
+def _power_sum(v: int, k: int) -> int:
+    """sum_{x=2}^{v} x^k for k <= 3."""
+    if k == 0:
+        return v - 1
+    t = v * (v + 1) // 2
+    if k == 1:
+        return t - 1
+    if k == 2:
+        return v * (v + 1) * (2 * v + 1) // 6 - 1
+    if k == 3:
+        return t * t - 1
+    raise ValueError("prime_poly degree > 3 is not supported")
+
+def prefix_sum(f: Multiplicative, n: int, mod=None) -> int:
+    """sum_{i=1}^{n} f(i) by min_25 (see module docstring); needs f.prime_poly."""
+    if n < 1:
+        return 0
+    if f.prime_poly is None:
+        raise ValueError("prefix_sum needs f.prime_poly (f(p) as a polynomial in p)")
+    sq = isqrt(n)
+    w = floor_values(n)
+    if not isinstance(w, list):
+        w = w.tolist()
+    primes = get_table(sq).primes
+    primes = primes[:bisect_right(primes, sq)]
+    use_np = np is not None and mod is not None and mod < _NUMPY_MOD_MAX
+    if use_np:
+        return _min25_numpy(f, n, sq, w, primes, mod)
+    return _min25_python(f, n, sq, w, primes, mod)
+
+def _min25_python(f, n, sq, w, primes, mod):
+    m = len(w)
+    small = [0] * (sq + 1)  # index of w == v for v <= sq
+    large = [0] * (sq + 1)  # index of w == n // j for j <= sq
+    for t, v in enumerate(w):
+        if v <= sq:
+            small[v] = t
+        else:
+            large[n // v] = t
+
+    def index(v):
+        return small[v] if v <= sq else large[n // v]
+
+    G = [0] * m
+    for k, c in enumerate(f.prime_poly):
+        if not c:
+            continue
+        g = [_power_sum(v, k) for v in w]
+        below = 0  # sum of q^k over primes q < p
+        for p in primes:
+            pk = p ** k
+            p2 = p * p
+            for t in range(m):
+                v = w[t]
+                if v < p2:
+                    break
+                g[t] -= pk * (g[index(v // p)] - below)
+                if mod:
+                    g[t] %= mod
+            below += pk
+        for t in range(m):
+            G[t] += c * g[t]
+    if mod:
+        G = [v % mod for v in G]
+    F = G[:]
+    prime_power = f.prime_power
+    for j in range(len(primes) - 1, -1, -1):
+        p = primes[j]
+        gp = G[index(p)]
+        p2 = p * p
+        for t in range(m):
+            v = w[t]
+            if v < p2:
+                break
+            add = 0
+            pe, e = p, 1
+            while pe * p <= v:
+                add += prime_power(p, e) * (F[index(v // pe)] - gp) + prime_power(p, e + 1)
+                pe *= p
+                e += 1
+            F[t] += add
+            if mod:
+                F[t] %= mod
+    total = F[0] + 1
+    return total % mod if mod else total
+
+def _min25_numpy(f, n, sq, w, primes, mod):
+    m = len(w)
+    wa = np.array(w, dtype=np.int64)
+    # w[t] = n // (t + 1) while w[t] > sqrt(n) (t < L); below that every v <= sqrt(n) occurs, at m - v.
+    L = int(np.count_nonzero(wa > sq))
+
+    def index(cnt, d):
+        """Positions of w[t] // d for t < cnt."""
+        a = min(cnt, L // d)
+        idx = np.empty(cnt, dtype=np.int64)
+        idx[:a] = np.arange(d - 1, a * d, d)
+        idx[a:] = m - wa[a:cnt] // d
+        return idx
+
+    # w is decreasing, so the w >= p^2 form a prefix; its length per prime:
+    neg = -wa
+    pa = np.array(primes, dtype=np.int64)
+    cuts = np.searchsorted(neg, -pa * pa, side="right").tolist()
+    # One row per power k with c_k != 0, so each prime needs a single index lookup.
+    ks = [k for k, c in enumerate(f.prime_poly) if c]
+    g = np.array([[_power_sum(v, k) % mod for v in w] for k in ks], dtype=np.int64).reshape(len(ks), m)
+    below = np.zeros((len(ks), 1), dtype=np.int64)  # sum of q^k over primes q < p
+    for p, cut in zip(primes, cuts):
+        pk = np.array([[pow(p, k, mod)] for k in ks], dtype=np.int64)
+        sub = index(cut, p)
+        g[:, :cut] = (g[:, :cut] - pk * ((g[:, sub] - below) % mod)) % mod
+        below = (below + pk) % mod
+    coef = np.array([[f.prime_poly[k] % mod] for k in ks], dtype=np.int64)
+    G = (coef * g % mod).sum(axis=0) % mod
+    F = G.copy()
+    prime_power = f.prime_power
+    for j in range(len(primes) - 1, -1, -1):
+        p, cut = primes[j], cuts[j]
+        gp = int(G[m - p])
+        add = np.zeros(cut, dtype=np.int64)
+        pe, e = p, 1
+        while pe * p <= w[0]:
+            cnt = int(np.searchsorted(neg[:cut], -pe * p, side="right"))
+            fe = prime_power(p, e) % mod
+            fe1 = prime_power(p, e + 1) % mod
+            sub = index(cnt, pe)
+            add[:cnt] = (add[:cnt] + fe * ((F[sub] - gp) % mod) + fe1) % mod
+            pe *= p
+            e += 1
+        F[:cut] = (F[:cut] + add) % mod
+    return int((F[0] + 1) % mod)
+
+def du_sieve(n: int, small_prefix, g_prefix, h_prefix, mod=None) -> int:
+    """
+    sum_{i=1}^{n} f(i) given f * g = h with g(1) = 1 (see module docstring).
+    small_prefix[v] = S(v) for v < len(small_prefix) (make it ~n^(2/3) long);
+    g_prefix(v), h_prefix(v) return the prefix sums of g and h.
+    """
+    memo = {}  # keyed by the distinct values n // d above the table
+
+    def S(v):
+        if v < len(small_prefix):
+            return small_prefix[v]
+        if v in memo:
+            return memo[v]
+        total = h_prefix(v)
+        for l, r, q in floor_blocks(v, 2):
+            total -= (g_prefix(r) - g_prefix(l - 1)) * S(q)
+            if mod:
+                total %= mod
+        memo[v] = total
+        return total
+
+    # Fill the memo from small to large values so the recursion depth stays O(1).
+    for k in range(max(1, n // len(small_prefix)), 0, -1):
+        S(n // k)
+    return S(n)
@@ -0,0 +1,285 @@
+"""
+Primality engine shared by the number theory scripts.
+
+is_prime(n) dispatches on the size of n:
+    n <= table limit    O(1) lookup in the shared SPF table (prime_tables.py)
+    gcd prefilter       gcd(n, product of the primes < _PREFILTER_BOUND) != 1 -> composite;
+                        rejects ~80% of random odd composites with one small gcd
+    n < 2^64            deterministic Miller-Rabin with the 7-base set of Jim Sinclair
+                        (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+    n >= 2^64           Baillie-PSW: strong probable prime to base 2 and strong Lucas
+                        probable prime with Selfridge's parameters (D first of 5, -7, 9, -11, ...
+                        with (D/n) = -1, P = 1, Q = (1 - D) / 4); no counterexample is known
+
+Strong Lucas test: write n + 1 = d * 2^s with d odd. n passes if U_d = 0 or V_{d 2^r} = 0 for
+some 0 <= r < s (mod n). U_k, V_k are computed with the doubling formulas
+    U_2k = U_k V_k,    V_2k = V_k^2 - 2 Q^k
+    U_k+1 = (P U_k + V_k) / 2,    V_k+1 = (D U_k + P V_k) / 2
+in O(log n) multiplications.
+
+is_prime_many(values) answers a whole batch: values below 2^64 through is_prime_array (numpy when
+available), the rest through the same dispatch.
+
+is_prime_array(values) is the array form for uint64 candidates (numpy array or array('Q')):
+a small-prime divisibility mask (one vectorized % per prime below _PREFILTER_BOUND) removes
+most composites, then the 7 deterministic Miller-Rabin bases run over the whole array at once.
+numpy has no 128-bit product, so modular multiplication is Montgomery's (R = 2^64):
+    a * b is formed from four 32x32-bit partial products (hi, lo words),
+    REDC(t) = (t + m n) / 2^64 with m = lo * (-n^-1 mod 2^64) (wrapping uint64 multiply),
+and x^d mod n is left-to-right binary exponentiation with per-element exponent bits as masks.
+"""
+from array import array
+from math import gcd, isqrt
+from prime_tables import get_table
+
+try:
+    import numpy as np
+except ImportError:  # is_prime_many falls back to a plain loop
+    np = None
+
+_TABLE_LIMIT = 10**6 + 9
+_PREFILTER_BOUND = 256
+_MR_BASES_64 = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+_ARRAY_BLOCK = 1 << 16  # is_prime_array works on blocks of this many candidates
+
+_primorial = 0
+
+def _table():
+    # Shared SPF table, built on first use (or mmap'd from PRIME_TABLE_PATH).
+    return get_table(_TABLE_LIMIT)
+
+def _prefilter_product() -> int:
+    global _primorial
+    if not _primorial:
+        _primorial = 1
+        for p in _table().primes:
+            if p >= _PREFILTER_BOUND:
+                break
+            _primorial *= p
+    return _primorial
+
+def _strong_probable_prime(n: int, a: int, d: int, s: int) -> bool:
+    """n - 1 = d * 2^s with d odd; True iff n is a strong probable prime to base a."""
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+def miller_rabin_64(n: int) -> bool:
+    """Deterministic Miller-Rabin for odd n < 2^64 (n > 1)."""
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    for a in _MR_BASES_64:
+        a %= n
+        if a and not _strong_probable_prime(n, a, d, s):
+            return False
+    return True
+
+def jacobi(a: int, n: int) -> int:
+    """Jacobi symbol (a/n) for odd n > 0."""
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+def strong_lucas(n: int) -> bool:
+    """Strong Lucas probable prime test with Selfridge's parameters (odd n > 1, not a square)."""
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    Q = (1 - D) // 4
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    U, V, Qk = 1, 1, Q % n  # U_1, V_1 (P = 1), Q^1
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = U + V, D * U + V
+            U = (U + n if U & 1 else U) >> 1
+            V %= n
+            V = (V + n if V & 1 else V) >> 1
+            U %= n
+            Qk = Qk * Q % n
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+def bpsw(n: int) -> bool:
+    """Baillie-PSW probable prime test for odd n > 1."""
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    if not _strong_probable_prime(n, 2, d >> s, s):
+        return False
+    r = isqrt(n)
+    if r * r == n:
+        return False
+    return strong_lucas(n)
+
+def is_prime(n: int) -> bool:
+    """Deterministic for n < 2^64, Baillie-PSW above (see module docstring)."""
+    table = _table()
+    if n <= table.limit:
+        return table.is_prime(n)
+    if gcd(n, _prefilter_product()) != 1:
+        return False
+    if n >> 64 == 0:
+        return miller_rabin_64(n)
+    return bpsw(n)
+
+def is_prime_many(values):
+    """
+    Returns:
+        list[bool], is_prime(v) for every v (in order); values in [0, 2^64) go through is_prime_array
+    """
+    values = list(values)
+    if np is None or not values:
+        return [is_prime(n) for n in values]
+    fits = [i for i, n in enumerate(values) if n >= 0 and not n >> 64]
+    out = [False] * len(values)
+    for i, h in zip(fits, is_prime_array([values[i] for i in fits]).tolist()):
+        out[i] = h
+    if len(fits) < len(values):
+        for i, n in enumerate(values):
+            if n >> 64:
+                out[i] = is_prime(n)
+    return out
+
+# --- Vectorized Miller-Rabin over uint64 arrays (numpy) ---
+
+def _mul_wide(a, b):
+    """(hi, lo) words of the 128-bit products a * b of two uint64 arrays."""
+    mask = np.uint64(0xFFFFFFFF)
+    s32 = np.uint64(32)
+    a0, a1 = a & mask, a >> s32
+    b0, b1 = b & mask, b >> s32
+    p01, p10 = a0 * b1, a1 * b0
+    mid = ((a0 * b0) >> s32) + (p01 & mask) + (p10 & mask)
+    hi = a1 * b1 + (p01 >> s32) + (p10 >> s32) + (mid >> s32)
+    return hi, a * b
+
+def _mont_mul(a, b, n, n_neg_inv):
+    """a * b / 2^64 mod n (Montgomery product) for a, b < n, elementwise."""
+    hi, lo = _mul_wide(a, b)
+    m = lo * n_neg_inv
+    mhi, _ = _mul_wide(m, n)
+    # lo + low(m n) == 0 mod 2^64, so it carries exactly when lo != 0.
+    s = hi + mhi
+    overflow = s < hi
+    t = s + (lo != 0)
+    overflow |= t < s
+    return np.where(overflow | (t >= n), t - n, t)
+
+def _mont_pow(base, exp, one, n, n_neg_inv):
+    """base^exp in Montgomery form (base and one are Montgomery forms), per-element exponents."""
+    x = one.copy()
+    for k in range(int(exp.max()).bit_length() - 1, -1, -1):
+        x = _mont_mul(x, x, n, n_neg_inv)
+        bit = ((exp >> np.uint64(k)) & np.uint64(1)).astype(bool)
+        x = np.where(bit, _mont_mul(x, base, n, n_neg_inv), x)
+    return x
+
+def _miller_rabin_array(n):
+    """Deterministic Miller-Rabin mask for an array of odd uint64 n > 1 with no factor below 256."""
+    # -n^-1 mod 2^64 by Newton's iteration (n * n == 1 mod 8 gives 3 correct bits).
+    inv = n.copy()
+    for _ in range(5):
+        inv *= np.uint64(2) - n * inv
+    n_neg_inv = np.uint64(0) - inv
+    # R mod n and R^2 mod n (R = 2^64), the latter by 64 modular doublings.
+    one = (np.uint64(0) - n) % n
+    r2 = one.copy()
+    for _ in range(64):
+        gap = n - r2
+        r2 = np.where(r2 >= gap, r2 - gap, r2 << np.uint64(1))
+    minus_one = n - one  # Montgomery form of n - 1
+    d = n - np.uint64(1)
+    s = np.zeros(len(n), dtype=np.uint64)
+    while True:
+        even = (d & np.uint64(1)) == 0
+        if not even.any():
+            break
+        d = np.where(even, d >> np.uint64(1), d)
+        s += even
+    alive = np.ones(len(n), dtype=bool)
+    live = np.arange(len(n))
+    for a in _MR_BASES_64:
+        # Composites almost always fail base 2, so later bases only run on the survivors.
+        nl, inv_l, one_l, m1_l = n[live], n_neg_inv[live], one[live], minus_one[live]
+        a_mod = np.uint64(a) % nl
+        base = _mont_mul(a_mod, r2[live], nl, inv_l)
+        x = _mont_pow(base, d[live], one_l, nl, inv_l)
+        passed = (a_mod == 0) | (x == one_l) | (x == m1_l)
+        s_l = s[live]
+        for r in range(1, int(s_l.max())):
+            x = _mont_mul(x, x, nl, inv_l)
+            passed |= (x == m1_l) & (np.uint64(r) < s_l)
+        alive[live[~passed]] = False
+        live = live[passed]
+        if not len(live):
+            break
+    return alive
+
+def is_prime_array(values):
+    """
+    Returns:
+        numpy bool array, is_prime(v) for every v of a uint64 array / array('Q') / sequence
+        (a list of bools when numpy is not installed)
+    """
+    if np is None:
+        return [is_prime(int(n)) for n in values]
+    if isinstance(values, (bytes, bytearray)):
+        arr = np.frombuffer(values, dtype=np.uint64)  # raw buffer, no typecode to go by
+    else:
+        if isinstance(values, (np.ndarray, array, memoryview)):
+            arr = np.asarray(values)  # array('i') / memoryview keep their own item type
+        else:
+            arr = np.array(list(values), dtype=object)  # Python ints up to 2^64 - 1
+        if arr.size and arr.dtype.kind not in "uiO":
+            raise TypeError("expected integers, got dtype %s" % arr.dtype)
+        if arr.size and arr.dtype.kind != "u" and arr.min() < 0:
+            raise ValueError("negative values")
+        arr = arr.astype(np.uint64, copy=False)
+    table = _table()
+    spf = np.frombuffer(table.spf, dtype=np.uint32)
+    small_primes = np.frombuffer(table.primes, dtype=np.uint32)
+    small_primes = small_primes[:np.searchsorted(small_primes, _PREFILTER_BOUND)].astype(np.uint64)
+    out = np.zeros(len(arr), dtype=bool)
+    for start in range(0, len(arr), _ARRAY_BLOCK):
+        block = arr[start:start + _ARRAY_BLOCK]
+        res = out[start:start + _ARRAY_BLOCK]
+        small = block <= np.uint64(table.limit)
+        idx = block[small].astype(np.int64)
+        res[small] = (spf[idx] == idx) & (idx >= 2)
+        big = ~small
+        for p in small_primes:
+            big &= (block % p) != 0
+        cand = np.flatnonzero(big)
+        if len(cand):
+            res[cand] = _miller_rabin_array(block[cand])
+    return out
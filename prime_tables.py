@@ -0,0 +1,148 @@
+"""
+Shared smallest-prime-factor / prime / pi table store.
+
+Layout (all native-endian uint32, see `array('I')`):
+    spf[0..limit]        smallest prime factor (spf[0] = 0, spf[1] = 1, spf[p] = p)
+    primes[0..k-1]       all primes <= limit in increasing order
+    block_pi[0..limit//B] number of primes < j*B (blocked prefix counts, B = PI_BLOCK)
+
+pi(n) for n <= limit is a bisection of `primes` between block_pi[n // B] and
+block_pi[n // B + 1] (at most the primes inside one block), so no per-integer
+pi list is kept.
+
+The table is built on first use (`get_table`), never at import time.
+`PrimeTable.save(path)` writes the arrays to one file; `PrimeTable.load(path)`
+maps that file read-only with mmap, so many worker processes share one copy of
+the pages. Setting PRIME_TABLE_PATH makes `get_table` map that file whenever it
+is large enough instead of sieving.
+
+Construction: Eratosthenes with slice assignment. Primes p <= sqrt(limit) are
+processed in decreasing order and write p into spf[p*p::p]; the last (smallest)
+writer of each composite is its smallest prime factor.
+Time O(limit log log limit) with the inner loop in C; memory 4 bytes per integer.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from math import isqrt
+
+PI_BLOCK = 64
+DEFAULT_LIMIT = 10**6 + 9
+
+_MAGIC = b"SPFTBL01"
+_HEADER = struct.Struct("<8s4sQQQQ")  # magic, byteorder, limit, block, n_primes, n_blocks
+
+
+class PrimeTable:
+    __slots__ = ("limit", "block", "spf", "primes", "block_pi", "_mm")
+
+    def __init__(self, limit, block, spf, primes, block_pi, mm=None):
+        self.limit = limit
+        self.block = block
+        self.spf = spf
+        self.primes = primes
+        self.block_pi = block_pi
+        self._mm = mm
+
+    def is_prime(self, n: int) -> bool:
+        """Bitmap-style lookup; requires n <= limit."""
+        return n >= 2 and self.spf[n] == n
+
+    def pi(self, n: int) -> int:
+        """Number of primes <= n; requires n <= limit."""
+        if n < 2:
+            return 0
+        j = n // self.block
+        block_pi = self.block_pi
+        hi = block_pi[j + 1] if j + 1 < len(block_pi) else len(self.primes)
+        return bisect_right(self.primes, n, block_pi[j], hi)
+
+    def factorize(self, x: int):
+        """Return list of (prime, exponent) of x; requires x <= limit."""
+        spf = self.spf
+        res = []
+        while x > 1:
+            p = spf[x]
+            cnt = 0
+            while x % p == 0:
+                x //= p
+                cnt += 1
+            res.append((p, cnt))
+        return res
+
+    def save(self, path: str) -> None:
+        """Write the table to `path` (atomically, via a temporary file)."""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, sys.byteorder[:4].encode().ljust(4), self.limit,
+                                 self.block, len(self.primes), len(self.block_pi)))
+            for arr in (self.spf, self.primes, self.block_pi):
+                f.write(memoryview(arr).cast("B"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PrimeTable":
+        """Map a table written by `save` read-only; pages are shared between processes."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, order, limit, block, n_primes, n_blocks = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or order.rstrip() != sys.byteorder[:4].encode():
+            mm.close()
+            raise ValueError("not a prime table for this platform: %r" % path)
+        view = memoryview(mm)
+        off = _HEADER.size
+        arrays = []
+        for count in (limit + 1, n_primes, n_blocks):
+            arrays.append(view[off:off + 4 * count].cast("I"))
+            off += 4 * count
+        return cls(limit, block, arrays[0], arrays[1], arrays[2], mm)
+
+
+def build_table(limit: int, block: int = PI_BLOCK) -> PrimeTable:
+    """Sieve a fresh table for 0..limit."""
+    limit = max(limit, 1)
+    spf = array("I", range(limit + 1))
+    is_prime = bytearray([1]) * (limit + 1)
+    is_prime[0] = is_prime[1] = 0
+    for p in range(2, isqrt(limit) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    primes = array("I", compress(range(limit + 1), is_prime))
+    del is_prime
+    for p in reversed(primes[:bisect_left(primes, isqrt(limit) + 1)]):
+        start = p * p
+        spf[start::p] = array("I", [p]) * len(range(start, limit + 1, p))
+    block_pi = array("I", (bisect_left(primes, j * block) for j in range(limit // block + 1)))
+    return PrimeTable(limit, block, spf, primes, block_pi)
+
+
+_table = None
+
+
+def get_table(limit: int = DEFAULT_LIMIT) -> PrimeTable:
+    """
+    Return the process-wide table covering at least 0..limit, building it on first use.
+    Growing rebuilds at least twice the previous size so repeated growth stays amortized.
+    """
+    global _table
+    if _table is not None and _table.limit >= limit:
+        return _table
+    path = os.environ.get("PRIME_TABLE_PATH")
+    if path and os.path.exists(path):
+        mapped = PrimeTable.load(path)
+        if mapped.limit >= limit:
+            _table = mapped
+            return _table
+    size = limit if _table is None else max(limit, 2 * _table.limit)
+    _table = build_table(size)
+    return _table
+
+
+def use_table(table: PrimeTable) -> None:
+    """Install `table` (for example one returned by PrimeTable.load) as the shared table."""
+    global _table
+    _table = table
@@ -0,0 +1,131 @@
+"""
+Quadratic extension rings Z_m[sqrt(d)]: elements a + b sqrt(d) stored as plain (a, b) tuples.
+
+    (a1 + b1 s)(a2 + b2 s) = (a1 a2 + d b1 b2) + (a1 b2 + a2 b1) s,   s^2 = d
+    conj(a + b s) = a - b s,   norm(a + b s) = a^2 - d b^2
+    (a + b s)^-1 = conj / norm   (when the norm is invertible mod m)
+
+For a prime m and a quadratic non-residue d this is the field GF(m^2); for any other m, d it is
+still a commutative ring, which is all pow, Lucas sequences and Fibonacci need.
+
+QuadraticRing(m, d).pow(x, e) keeps the running product and the square in four local ints: no
+tuple or object is created per step, one reduction per coordinate. pow_many raises many elements
+to the same exponent, as numpy int64 columns when m < 2^31 (every product stays below 2^62).
+
+Built on top:
+sqrt_mod(n, p)          Cipolla: pick t with t^2 - n a non-residue mod p, then
+                        (t + sqrt(t^2 - n))^((p + 1) / 2) in GF(p^2) is a square root of n
+lucas_uv(P, Q, n, m)    (U_n, V_n) mod odd m for x^2 - P x + Q, D = P^2 - 4 Q:
+                        ((P + sqrt(D)) / 2)^n = (V_n + U_n sqrt(D)) / 2
+fib(n, m)               F_n mod odd m from phi^n alone: phi^n = (L_n + F_n sqrt(5)) / 2, so the
+                        conjugate power (1 - phi)^n and the division by sqrt(5) are never needed
+"""
+from primality import jacobi
+
+try:
+    import numpy as np
+except ImportError:  # pow_many loops over the elements
+    np = None
+
+_NUMPY_MOD_MAX = 1 << 31
+
+class QuadraticRing:
+    __slots__ = ("m", "d")
+
+    def __init__(self, m: int, d: int):
+        self.m = m
+        self.d = d % m
+
+    def __repr__(self):
+        return "QuadraticRing(m=%d, d=%d)" % (self.m, self.d)
+
+    def element(self, a: int, b: int = 0):
+        return a % self.m, b % self.m
+
+    def add(self, x, y):
+        m = self.m
+        return (x[0] + y[0]) % m, (x[1] + y[1]) % m
+
+    def sub(self, x, y):
+        m = self.m
+        return (x[0] - y[0]) % m, (x[1] - y[1]) % m
+
+    def mul(self, x, y):
+        m = self.m
+        a1, b1 = x
+        a2, b2 = y
+        return (a1 * a2 + self.d * b1 % m * b2) % m, (a1 * b2 + a2 * b1) % m
+
+    def conj(self, x):
+        return x[0], -x[1] % self.m
+
+    def norm(self, x) -> int:
+        a, b = x
+        return (a * a - self.d * b % self.m * b) % self.m
+
+    def inv(self, x):
+        """x^-1; raises ValueError when the norm of x is not invertible mod m."""
+        n = self.norm(x)
+        try:
+            t = pow(n, -1, self.m)
+        except ValueError:
+            raise ValueError("element is not invertible") from None
+        return x[0] * t % self.m, -x[1] * t % self.m
+
+    def pow(self, x, e: int):
+        """x^e for e >= 0 (negative e: inverse first)."""
+        if e < 0:
+            x, e = self.inv(x), -e
+        m, d = self.m, self.d
+        a, b = x
+        ra, rb = 1 % m, 0
+        for bit in bin(e)[2:]:
+            ra, rb = (ra * ra + d * rb % m * rb) % m, 2 * ra * rb % m
+            if bit == "1":
+                ra, rb = (ra * a + d * rb % m * b) % m, (ra * b + rb * a) % m
+        return ra, rb
+
+    def pow_many(self, xs, e: int):
+        """[x^e for x in xs] (e >= 0); one shared pass over the bits of e."""
+        xs = list(xs)
+        m, d = self.m, self.d
+        if np is None or m >= _NUMPY_MOD_MAX or not xs:
+            return [self.pow(x, e) for x in xs]
+        a = np.array([x[0] % m for x in xs], dtype=np.int64)
+        b = np.array([x[1] % m for x in xs], dtype=np.int64)
+        ra = np.full(len(xs), 1 % m, dtype=np.int64)
+        rb = np.zeros(len(xs), dtype=np.int64)
+        for bit in bin(e)[2:]:
+            ra, rb = (ra * ra % m + d * (rb * rb % m)) % m, 2 * (ra * rb % m) % m
+            if bit == "1":
+                ra, rb = (ra * a % m + d * (rb * b % m)) % m, (ra * b % m + rb * a % m) % m
+        return list(zip(ra.tolist(), rb.tolist()))
+
+def sqrt_mod(n: int, p: int):
+    """A square root of n modulo an odd prime p (Cipolla); None if n is a non-residue."""
+    n %= p
+    if n == 0:
+        return 0
+    if jacobi(n, p) != 1:
+        return None
+    t = 0
+    while jacobi((t * t - n) % p, p) != -1:
+        t += 1
+    r = QuadraticRing(p, t * t - n).pow((t, 1), (p + 1) // 2)[0]
+    return min(r, p - r)
+
+def lucas_uv(P: int, Q: int, n: int, m: int):
+    """(U_n, V_n) mod odd m of the Lucas sequences of x^2 - P x + Q (n >= 0)."""
+    if m % 2 == 0:
+        raise ValueError("m must be odd")
+    half = (m + 1) // 2
+    ring = QuadraticRing(m, P * P - 4 * Q)
+    v2, u2 = ring.pow((P * half, half), n)  # (V_n / 2, U_n / 2)
+    return 2 * u2 % m, 2 * v2 % m
+
+def fib(n: int, m: int) -> int:
+    """F_n mod odd m (n >= 0), from phi^n in Z_m[sqrt(5)]."""
+    if m % 2 == 0:
+        raise ValueError("m must be odd")
+    half = (m + 1) // 2
+    return 2 * QuadraticRing(m, 5).pow((half, half), n)[1] % m
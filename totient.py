@@ -0,0 +1,209 @@
+"""
+Euler totient engine shared by the number theory scripts.
+
+    phi(n) = n * prod_{p | n} (1 - 1/p)
+
+phi(n)              one factorization (factorization.py: SPF table, Brent rho, ECM) per distinct n,
+                    memoized in a bounded LRU, so repeated moduli cost a dict lookup
+phi_range(limit)    phi(0..limit) into a compact typed array (array('I'), or 'Q' past 2^32)
+phi_range(l, r)     phi(l..r) for a window far from 0, segment by segment
+power_tower(bs, m)  b0^b1^...^bk mod m over the cached totient chain m, phi(m), phi(phi(m)), ..., 1
+
+Single argument: linear sieve over the shared SPF table, with p = spf(i) and j = i / p,
+    phi(i) = phi(j) * p        if p | j
+    phi(i) = phi(j) * (p - 1)  otherwise
+O(limit) time. With numpy the segmented routine below is used instead (vectorized, faster).
+
+Window: every n in [l, r] has at most one prime factor above sqrt(r). For each prime
+p <= sqrt(r) the multiples of p in the segment get res -= res / p and have p divided out of
+rem (one pass per power of p); afterwards rem > 1 is that large prime and gets the same update.
+O((r - l) log log r + sqrt(r)) time, one segment of memory; numpy vectorizes each pass.
+
+Power towers: for e >= phi(m) (which is at least every prime exponent of m),
+    a^e == a^(phi(m) + e mod phi(m))  (mod m)   for every a, coprime to m or not,
+so a tower is reduced level by level down the totient chain, and the exponent needed at each
+level is the next level's value mod the next chain entry. The exact tail values, saturated at
+m, decide whether a level's exponent is small enough to use as is; once the chain reaches 1 the
+remaining levels contribute 0. The chain has O(log m) entries and is cached per modulus.
+Nothing is computed at import.
+"""
+from array import array
+from functools import lru_cache
+from math import isqrt
+from factorization import factorize
+from prime_tables import get_table
+from seive import iter_primes
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python passes are used instead
+    np = None
+
+_PHI_CACHE_SIZE = 1 << 16
+_CHAIN_CACHE_SIZE = 1 << 10
+_SEGMENT = 1 << 18
+_NUMPY_MAX = 1 << 62  # window values must fit in int64
+
+@lru_cache(maxsize=_PHI_CACHE_SIZE)
+def phi(n: int) -> int:
+    """
+    Compute Euler's Totient (phi) of n.
+    phi(n) = count of integers k in [1, n] such that gcd(k, n) = 1.
+    Requires n >= 1.
+    """
+    result = n
+    for p in set(factorize(n)):
+        result -= result // p
+    return result
+
+def _typecode(top: int) -> str:
+    return "I" if top < 1 << 32 else "Q"
+
+def _linear(limit: int):
+    spf = get_table(limit).spf
+    out = array(_typecode(limit), [0]) * (limit + 1)
+    if limit >= 1:
+        out[1] = 1
+    for i in range(2, limit + 1):
+        p = spf[i]
+        j = i // p
+        out[i] = out[j] * (p if j % p == 0 else p - 1)
+    return out
+
+def _segment_numpy(lo: int, hi: int, primes):
+    """phi(lo..hi-1) as an int64 array."""
+    res = np.arange(lo, hi, dtype=np.int64)
+    rem = res.copy()
+    for p in primes:
+        if p * p >= hi:
+            break
+        start = -lo % p
+        if start >= hi - lo:
+            continue
+        res[start::p] -= res[start::p] // p
+        pk = p
+        while pk < hi:
+            start = -lo % pk
+            if start < hi - lo:
+                rem[start::pk] //= p
+            pk *= p
+    big = rem > 1
+    res[big] -= res[big] // rem[big]
+    return res
+
+def _segment_python(lo: int, hi: int, primes):
+    """phi(lo..hi-1) as a list."""
+    res = list(range(lo, hi))
+    rem = res[:]
+    for p in primes:
+        if p * p >= hi:
+            break
+        start = -lo % p
+        res[start::p] = [v - v // p for v in res[start::p]]
+        pk = p
+        while pk < hi:
+            start = -lo % pk
+            rem[start::pk] = [v // p for v in rem[start::pk]]
+            pk *= p
+    return [v - v // q if q > 1 else v for v, q in zip(res, rem)]
+
+def iter_phi_segments(l: int, r: int, segment: int = _SEGMENT):
+    """Yields (lo, values) with values[i] = phi(lo + i), covering [l, r] in increasing order."""
+    l = max(l, 0)
+    if r < l:
+        return
+    primes = list(iter_primes(2, isqrt(r)))
+    vectorized = np is not None and r < _NUMPY_MAX
+    for lo in range(l, r + 1, segment):
+        hi = min(lo + segment, r + 1)
+        yield lo, _segment_numpy(lo, hi, primes) if vectorized else _segment_python(lo, hi, primes)
+
+def phi_range(l: int, r=None):
+    """
+    phi_range(limit) -> phi(0..limit); phi_range(l, r) -> phi(l..r) (phi(0) is 0).
+    Returns a typed array (array('I'), or array('Q') once values can reach 2^32).
+    """
+    linear = r is None and np is None
+    if r is None:
+        l, r = 0, l
+    if l < 0 or l > r:
+        raise ValueError("need 0 <= l <= r")
+    if linear:
+        return _linear(r)
+    out = array(_typecode(r))
+    for _, values in iter_phi_segments(l, r):
+        if np is not None and not isinstance(values, list):
+            out.frombytes(values.astype(np.uint32 if out.typecode == "I" else np.uint64).tobytes())
+        else:
+            out.extend(values)
+    return out
+
+@lru_cache(maxsize=_CHAIN_CACHE_SIZE)
+def totient_chain(m: int):
+    """Returns (m, phi(m), phi(phi(m)), ..., 1) for m >= 1."""
+    chain = [m]
+    while chain[-1] > 1:
+        chain.append(phi(chain[-1]))
+    return tuple(chain)
+
+def _capped_tails(bases, cap: int):
+    """tails[i] = min(bases[i] ^ bases[i+1] ^ ... (right-associative), cap)."""
+    tails = [0] * len(bases)
+    v = min(bases[-1], cap)
+    tails[-1] = v
+    for i in range(len(bases) - 2, -1, -1):
+        b = bases[i]
+        if v == 0 or b == 1:
+            v = 1
+        elif b == 0:
+            v = 0
+        elif v >= cap.bit_length():
+            v = cap
+        else:
+            v = min(b ** v, cap)
+        tails[i] = v
+    return tails
+
+def power_tower(bases, m: int) -> int:
+    """
+    Returns bases[0] ^ bases[1] ^ ... ^ bases[-1] mod m (right-associative, x^0 = 1),
+    for non-negative bases and m >= 1. An empty tower is 1.
+    """
+    bases = list(bases)
+    if m == 1:
+        return 0
+    if not bases:
+        return 1 % m
+    chain = totient_chain(m)
+    tails = _capped_tails(bases, m)
+    pending = []
+    i = d = 0
+    while True:
+        mod = chain[d]
+        if mod == 1:
+            val = 0
+            break
+        if i == len(bases) - 1:
+            val = bases[i] % mod
+            break
+        ph = chain[d + 1]
+        if tails[i + 1] < ph:
+            val = pow(bases[i], tails[i + 1], mod)
+            break
+        pending.append((bases[i], mod, ph))
+        i += 1
+        d += 1
+    for a, mod, ph in reversed(pending):
+        val = pow(a, ph + val, mod)
+    return val
+
+def power_tower_many(towers, m: int):
+    """Returns [power_tower(t, m) for t in towers]; the chain is built once, repeated towers evaluated once."""
+    done = {}
+    out = []
+    for t in towers:
+        key = tuple(t)
+        if key not in done:
+            done[key] = power_tower(key, m)
+        out.append(done[key])
+    return out